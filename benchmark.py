@@ -0,0 +1,342 @@
+"""Benchmarks for the curator and website generator.
+
+Usage:
+    python benchmark.py render --sizes 1000 10000 100000
+    python benchmark.py cache --sizes 1000 10000 50000
+    python benchmark.py e2e --queries 6 --latency 0.05 --rate-limit 30
+    python benchmark.py velocity --repos 5000 --days 365
+    python benchmark.py dupes --sizes 10000 50000
+    python benchmark.py stream --sizes 10000 100000
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import curator_v7
+import generate_website
+import near_duplicates
+from http_replay import RecordingSession, ReplaySession
+from repo_store import RepoStore
+from tests.synthetic_github import SyntheticGitHub
+
+LANGUAGES = ['Python', 'JavaScript', 'Go', 'Rust', 'C++', 'Java']
+TOPICS = ['ai', 'llm', 'osint', 'security', 'cybersecurity', 'mcp', 'agents',
+          'pentesting', 'threat-intelligence', 'reconnaissance', 'machine-learning']
+
+
+def synthetic_repos(count, seed=42):
+    """Build normalized repository records shaped like generate_website's input."""
+    rng = random.Random(seed)
+    repos = []
+    for i in range(count):
+        name = f"repo-{i}"
+        repos.append({
+            'name': name,
+            'full_name': f"owner{i % 997}/{name}",
+            'html_url': f"https://github.com/owner{i % 997}/{name}",
+            'description': ' '.join(rng.choice(TOPICS) for _ in range(rng.randint(4, 20))),
+            'stars': rng.randint(5, 50000),
+            'language': rng.choice(LANGUAGES),
+            'last_updated': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'topics': rng.sample(TOPICS, rng.randint(0, 6)),
+        })
+    repos.sort(key=lambda repo: repo['stars'], reverse=True)
+    return repos
+
+
+def measure(func, *args):
+    """Run func once and return (seconds, peak traced bytes)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_render(sizes):
+    """Compare streaming to the output file against joining the page in memory."""
+    timestamp = '2026-01-01 00:00:00 UTC'
+    print(f"{'repos':>8} {'mode':>8} {'seconds':>9} {'peak MB':>9} {'output MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'index.html')
+        for size in sizes:
+            repos = synthetic_repos(size)
+
+            elapsed, peak = measure(generate_website.write_html, repos, output_path, timestamp)
+            output_mb = os.path.getsize(output_path) / 1e6
+            print(f"{size:>8} {'stream':>8} {elapsed:>9.3f} {peak / 1e6:>9.2f} {output_mb:>10.2f}")
+
+            elapsed, peak = measure(lambda: ''.join(generate_website.iter_html(repos, timestamp)))
+            print(f"{size:>8} {'join':>8} {elapsed:>9.3f} {peak / 1e6:>9.2f} {output_mb:>10.2f}")
+
+
+# The pre-slots RepoInfo layout, for comparison with the current class
+LegacyRepoInfo = dataclasses.make_dataclass(
+    'LegacyRepoInfo', [(f.name, f.type, f) for f in dataclasses.fields(curator_v7.RepoInfo)]
+)
+
+
+def synthetic_repo_infos(count, seed=42):
+    licenses = ['MIT License', 'Apache License 2.0', 'GNU General Public License v3.0', None]
+    return [
+        curator_v7.RepoInfo(
+            name=repo['name'], full_name=repo['full_name'], html_url=repo['html_url'],
+            description=repo['description'], stars=repo['stars'], language=repo['language'],
+            last_updated=repo['last_updated'], topics=repo['topics'],
+            license_name=licenses[i % len(licenses)], is_fork=False, size_kb=1000 + i,
+        )
+        for i, repo in enumerate(synthetic_repos(count, seed))
+    ]
+
+
+def _legacy_save(repos, filename):
+    with open(filename, 'w') as f:
+        json.dump({'timestamp': time.time(), 'repositories': [dataclasses.asdict(repo) for repo in repos]}, f, indent=2)
+
+
+def _legacy_load(filename):
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    return [LegacyRepoInfo(**repo_data) for repo_data in data['repositories']]
+
+
+def _resident(load, *args):
+    """Time a load and measure the memory still held by its result."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load(*args)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current
+
+
+def bench_cache(sizes):
+    """Compare the legacy asdict/indent=2 cache with the row-format cache of slotted RepoInfo."""
+    curator = curator_v7.GitHubCurator.__new__(curator_v7.GitHubCurator)
+    curator.config = {'enable_caching': True, 'cache_duration_hours': 24}
+    curator.query_stats = {}
+    encoder = 'orjson' if curator_v7.orjson is not None else 'json'
+    print(f"row format encoder: {encoder}")
+    print(f"{'repos':>8} {'format':>8} {'save s':>8} {'load s':>8} {'file MB':>8} {'held MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'cache.json')
+        for size in sizes:
+            repos = synthetic_repo_infos(size)
+            legacy_repos = [LegacyRepoInfo(*repo.to_row()) for repo in repos]
+
+            save_seconds, _ = measure(_legacy_save, legacy_repos, filename)
+            load_seconds, held = _resident(_legacy_load, filename)
+            file_mb = os.path.getsize(filename) / 1e6
+            print(f"{size:>8} {'legacy':>8} {save_seconds:>8.3f} {load_seconds:>8.3f} {file_mb:>8.2f} {held / 1e6:>8.2f}")
+
+            query_cache = {'bench': {'timestamp': time.time(), 'repositories': repos}}
+            save_seconds, _ = measure(curator.save_cache, repos, query_cache, filename)
+            load_seconds, held = _resident(curator.load_cache, filename)
+            file_mb = os.path.getsize(filename) / 1e6
+            print(f"{size:>8} {'rows':>8} {save_seconds:>8.3f} {load_seconds:>8.3f} {file_mb:>8.2f} {held / 1e6:>8.2f}")
+
+
+def _e2e_config(queries, cache_hours):
+    return {
+        'search_queries': [f"{topic} security stars:>5" for topic in TOPICS[:queries]],
+        'filters': {'min_stars': 5, 'min_size': 0, 'languages': [], 'exclude_keywords': []},
+        'max_repos_per_query': 200,
+        'enable_caching': True,
+        'cache_duration_hours': cache_hours,
+        'advanced_options': {'http_mode': 'replay', 'fixtures_dir': 'fixtures', 'max_workers': 4,
+                             'min_last_update_days': 3650},
+    }
+
+
+def _stage(name, session, func):
+    requests_before, bytes_before = session.request_count, session.bytes_transferred
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed, peak = measure(func)
+    print(f"{name:<12} {elapsed:>9.3f} {session.request_count - requests_before:>9} "
+          f"{(session.bytes_transferred - bytes_before) / 1e3:>9.1f} {peak / 1e6:>9.2f}")
+
+
+def bench_e2e(queries, latency, rate_limit, window):
+    """Replay recorded search fixtures through run() and generate_website()"""
+    logging.getLogger(curator_v7.__name__).setLevel(logging.WARNING)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            with open('config.json', 'w') as f:
+                json.dump(_e2e_config(queries, 0), f)
+            recorder = RecordingSession('fixtures', SyntheticGitHub())
+            curator_v7.GitHubCurator(session=recorder).run()
+            for path in ('cache.json', 'http_cache.json.gz', 'repositories.db', 'README.md'):
+                os.remove(path)
+            print(f"recorded {len(os.listdir('fixtures'))} fixtures for {queries} queries")
+
+            replay = ReplaySession('fixtures', latency_seconds=latency, rate_limit=rate_limit, window_seconds=window)
+            print(f"{'stage':<12} {'seconds':>9} {'requests':>9} {'KB':>9} {'peak MB':>9}")
+            # cache_duration_hours=0 makes the second run revalidate every page with its ETag
+            _stage('cold run', replay, curator_v7.GitHubCurator(session=replay).run)
+            _stage('revalidate', replay, curator_v7.GitHubCurator(session=replay).run)
+            with open('config.json', 'w') as f:
+                json.dump(_e2e_config(queries, 24), f)
+            _stage('cached run', replay, curator_v7.GitHubCurator(session=replay).run)
+            _stage('website', replay, generate_website.generate_website)
+            if replay.missing:
+                print(f"warning: {replay.missing} requests had no fixture")
+        finally:
+            os.chdir(cwd)
+
+
+def bench_velocity(repo_count, days, windows):
+    """Fill the snapshot log with a daily history and time velocity lookups over it"""
+    rng = random.Random(42)
+    names = [f"owner{i % 997}/repo-{i}" for i in range(repo_count)]
+    growth = [rng.uniform(0, 20) for _ in names]
+    with tempfile.TemporaryDirectory() as tmp_dir, RepoStore(os.path.join(tmp_dir, 'bench.db')) as store:
+        store.upsert({'name': name.split('/')[1], 'full_name': name, 'html_url': f"https://github.com/{name}", 'stars': 0}
+                     for name in names)
+        started = time.perf_counter()
+        for day in range(days):
+            store.record_snapshots(((name, int(100 + rate * day)) for name, rate in zip(names, growth)), day)
+        elapsed = time.perf_counter() - started
+        db_mb = os.path.getsize(store.path) / 1e6
+        print(f"logged {repo_count * days:,} snapshots in {elapsed:.2f}s ({elapsed / days * 1000:.1f} ms/run), {db_mb:.1f} MB")
+        print(f"{'window':>8} {'seconds':>9} {'repos':>7}")
+        for window in windows:
+            started = time.perf_counter()
+            velocities = store.star_velocity(window)
+            print(f"{window:>8} {time.perf_counter() - started:>9.3f} {len(velocities):>7}")
+
+
+def synthetic_with_duplicates(count, duplicate_share=0.1, seed=42):
+    """Distinct repositories plus renamed copies with one description word changed"""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(5000)]
+    repos = []
+    for i in range(count):
+        repos.append({'name': f"project-{i}", 'full_name': f"owner{i}/project-{i}",
+                      'description': ' '.join(rng.sample(words, rng.randint(8, 20))),
+                      'topics': rng.sample(TOPICS, rng.randint(1, 5))})
+    copies = {}
+    for original in rng.sample(range(count), int(count * duplicate_share)):
+        repo = repos[original]
+        description = repo['description'].split()
+        description[rng.randrange(len(description))] = rng.choice(words)
+        copies[len(repos)] = original
+        repos.append({'name': repo['name'], 'full_name': f"mirror{original}/{repo['name']}",
+                      'description': ' '.join(description), 'topics': list(repo['topics'])})
+    return repos, copies
+
+
+def bench_dupes(sizes, threshold):
+    """Time MinHash/LSH clustering and check it finds the injected copies"""
+    print(f"numpy: {near_duplicates.np is not None}")
+    print(f"{'repos':>8} {'seconds':>9} {'clusters':>9} {'recall':>7} {'false':>7}")
+    for size in sizes:
+        repos, copies = synthetic_with_duplicates(size)
+        token_sets = [near_duplicates.repo_tokens(repo['name'], repo['description'], repo['topics']) for repo in repos]
+        started = time.perf_counter()
+        clusters = near_duplicates.find_clusters(token_sets, threshold=threshold)
+        elapsed = time.perf_counter() - started
+        root = {index: members[0] for members in clusters for index in members}
+        found = sum(1 for copy, original in copies.items() if root.get(copy, copy) == root.get(original, original))
+        # Members that are neither an injected copy nor the original it was copied from
+        originals = set(copies.values())
+        false = sum(1 for members in clusters for index in members if index not in copies and index not in originals)
+        print(f"{len(repos):>8} {elapsed:>9.3f} {len(clusters):>9} {found / max(1, len(copies)):>7.3f} {false:>7}")
+
+
+def bench_stream(sizes):
+    """Peak memory of loading the JSON sources whole versus streaming them through the merge"""
+    print(f"{'repos':>8} {'load MB':>9} {'stream s':>9} {'stream MB':>10} {'merged':>8}")
+    fields = ['name', 'full_name', 'html_url', 'description', 'stars', 'language', 'last_updated', 'topics']
+    cwd = os.getcwd()
+    for size in sizes:
+        repos = synthetic_repos(size)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                with open('cache.json', 'w', encoding='utf-8') as f:
+                    json.dump({'format': 'rows-v1', 'fields': fields,
+                               'rows': [[repo[name] for name in fields] for repo in repos[::2]]}, f)
+                # The legacy list overlaps the cache by half, with its own url/updated keys
+                with open('repositories.json', 'w', encoding='utf-8') as f:
+                    json.dump([{'name': repo['name'], 'url': repo['html_url'], 'stars': repo['stars'],
+                                'updated': repo['last_updated'], 'topics': repo['topics']}
+                               for repo in repos[size // 4:]], f)
+                del repos
+
+                def load_whole():
+                    for path in ('cache.json', 'repositories.json'):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            json.load(f)
+
+                merged = []
+
+                def stream():
+                    merged.append(sum(1 for _ in generate_website._load_repos_from_json()))
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, load_peak = measure(load_whole)
+                    stream_seconds, stream_peak = measure(stream)
+            finally:
+                os.chdir(cwd)
+        print(f"{size:>8} {load_peak / 1e6:>9.1f} {stream_seconds:>9.2f} {stream_peak / 1e6:>10.1f} {merged[0]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render_parser = subparsers.add_parser('render', help='HTML render time and peak memory')
+    render_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+
+    cache_parser = subparsers.add_parser('cache', help='cache save/load time and resident memory')
+    cache_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+
+    e2e_parser = subparsers.add_parser('e2e', help='replay recorded fixtures through the curator and website')
+    e2e_parser.add_argument('--queries', type=int, default=6)
+    e2e_parser.add_argument('--latency', type=float, default=0.05, help='synthetic seconds per request')
+    e2e_parser.add_argument('--rate-limit', type=int, default=30, help='requests per simulated window')
+    e2e_parser.add_argument('--window', type=float, default=60.0, help='rate-limit window in seconds')
+
+    velocity_parser = subparsers.add_parser('velocity', help='snapshot log size and star-velocity lookup time')
+    velocity_parser.add_argument('--repos', type=int, default=5000)
+    velocity_parser.add_argument('--days', type=int, default=365)
+    velocity_parser.add_argument('--windows', type=int, nargs='+', default=[7, 30, 90])
+
+    dupes_parser = subparsers.add_parser('dupes', help='near-duplicate clustering time and recall')
+    dupes_parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    dupes_parser.add_argument('--threshold', type=float, default=0.8)
+
+    stream_parser = subparsers.add_parser('stream', help='peak memory of whole-file versus streaming JSON loads')
+    stream_parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+
+    args = parser.parse_args()
+    if args.command == 'render':
+        bench_render(args.sizes)
+    elif args.command == 'cache':
+        bench_cache(args.sizes)
+    elif args.command == 'e2e':
+        bench_e2e(args.queries, args.latency, args.rate_limit, args.window)
+    elif args.command == 'velocity':
+        bench_velocity(args.repos, args.days, args.windows)
+    elif args.command == 'dupes':
+        bench_dupes(args.sizes, args.threshold)
+    elif args.command == 'stream':
+        bench_stream(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Long-running service mode for the curator.
+
+CuratorDaemon keeps one GitHubCurator, its per-query results and the ranked
+list in memory. Each tick it refreshes only the queries whose schedule is
+due (hot queries can be given shorter intervals), and rewrites README.md,
+the store and the website only when the ranked list actually changed. A
+small HTTP server answers from pre-serialized snapshots with ETags, so
+repeat polls cost a hash comparison.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+from curator_v7 import GitHubCurator, RepoInfo, TokenRejectedError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'host': '127.0.0.1',
+    'port': 8000,
+    'tick_seconds': 60,
+    'query_intervals': {},
+    'failure_retry_minutes': 15,
+    'regenerate_website': True,
+}
+
+
+class QuerySchedule:
+    """When each configured query is next due, from its own interval or the cache duration"""
+
+    def __init__(self, intervals: Dict[str, float], default_minutes: float, failure_retry_minutes: float):
+        self.intervals = {query.strip(): float(minutes) * 60 for query, minutes in intervals.items()}
+        self.default_seconds = float(default_minutes) * 60
+        self.failure_retry_seconds = float(failure_retry_minutes) * 60
+        self.next_run: Dict[str, float] = {}
+
+    def interval(self, query: str) -> float:
+        return self.intervals.get(query, self.default_seconds)
+
+    def due(self, effective_queries: Dict[str, str], query_cache: Dict[str, Dict], now: float) -> List[str]:
+        """Queries never fetched under their current effective query, or past their next run"""
+        due = []
+        for query, effective_query in effective_queries.items():
+            entry = query_cache.get(effective_query)
+            if entry is None:
+                due.append(query)
+                continue
+            next_run = self.next_run.get(effective_query, entry['timestamp'] + self.interval(query))
+            if now >= next_run:
+                due.append(query)
+        return due
+
+    def mark(self, queries: List[str], effective_queries: Dict[str, str], failed: Set[str], now: float):
+        """Schedule refreshed queries again; failed ones come back sooner"""
+        for query in queries:
+            effective_query = effective_queries[query]
+            delay = min(self.interval(query), self.failure_retry_seconds) if effective_query in failed else self.interval(query)
+            self.next_run[effective_query] = now + delay
+
+
+class Snapshot:
+    """Serialized responses for one published list, each with its ETag"""
+
+    def __init__(self, repos: List[RepoInfo], markdown: str, generated: str):
+        self.generated = generated
+        listing = json.dumps({
+            'generated': generated,
+            'total': len(repos),
+            'repos': [repo.to_dict() for repo in repos],
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.responses = {
+            '/repos.json': self._entry(listing, 'application/json; charset=utf-8'),
+            '/README.md': self._entry(markdown.encode('utf-8'), 'text/markdown; charset=utf-8'),
+        }
+        self.responses['/'] = self.responses['/README.md']
+
+    @staticmethod
+    def _entry(body: bytes, content_type: str) -> Dict:
+        return {'body': body, 'etag': f'"{hashlib.sha256(body).hexdigest()[:32]}"', 'content_type': content_type}
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """GET/HEAD for the current snapshot, plus /status with the refresh schedule"""
+
+    server_version = 'CuratorDaemon/1.0'
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head: bool):
+        daemon = self.server.curator_daemon
+        path = self.path.split('?', 1)[0]
+        if path == '/status':
+            self._send(200, json.dumps(daemon.status(), indent=2).encode('utf-8'),
+                       'application/json; charset=utf-8', head, {'Cache-Control': 'no-store'})
+            return
+        snapshot = daemon.snapshot
+        if snapshot is None:
+            self._send(503, b'Curator is still loading\n', 'text/plain; charset=utf-8', head, {'Retry-After': '5'})
+            return
+        entry = snapshot.responses.get(path)
+        if entry is None:
+            self._send(404, b'Not found\n', 'text/plain; charset=utf-8', head)
+            return
+        headers = {'ETag': entry['etag'], 'Cache-Control': 'no-cache'}
+        if self.headers.get('If-None-Match') == entry['etag']:
+            self._send(304, b'', entry['content_type'], True, headers)
+            return
+        self._send(200, entry['body'], entry['content_type'], head, headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, head: bool, headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class CuratorDaemon:
+    """Refresh queries on their schedules and serve the current list until stopped"""
+
+    def __init__(self, curator: GitHubCurator, settings: Optional[Dict] = None):
+        self.curator = curator
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.schedule = QuerySchedule(
+            self.settings['query_intervals'],
+            float(curator.config.get('cache_duration_hours', 24)) * 60,
+            float(self.settings['failure_retry_minutes'])
+        )
+        self.query_cache: Dict[str, Dict] = {}
+        self.snapshot: Optional[Snapshot] = None
+        self.digest: Optional[str] = None
+        self.cycles = 0
+        self.publishes = 0
+        self.started_at = time.time()
+        self._effective_queries: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @staticmethod
+    def _digest(repos: List[RepoInfo]) -> str:
+        rows = json.dumps([repo.to_row() for repo in repos], ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(rows.encode('utf-8')).hexdigest()
+
+    def tick(self, now: Optional[float] = None) -> bool:
+        """Refresh due queries and publish if the ranked list changed; True when outputs were rewritten"""
+        now = time.time() if now is None else now
+        curator = self.curator
+        # Recomputed every tick: the pushed:>= qualifier moves with the date
+        effective_queries = curator.effective_queries()
+        due = self.schedule.due(effective_queries, self.query_cache, now)
+        if not due and self.snapshot is not None:
+            return False
+
+        self.cycles += 1
+        curator.start_cycle()
+        failed = curator.refresh_queries(self.query_cache, due, effective_queries) if due else set()
+        self.schedule.mark(due, effective_queries, failed, now)
+        self._effective_queries = effective_queries
+        self.query_cache = {key: self.query_cache[key] for key in effective_queries.values()}
+        all_repos = curator.build_collection(self.query_cache, effective_queries)
+
+        if due:
+            with curator.metrics.span('cache_save'):
+                curator.save_cache(all_repos, {key: entry for key, entry in self.query_cache.items() if key not in failed})
+
+        digest = self._digest(all_repos)
+        changed = digest != self.digest
+        if changed:
+            published, markdown = curator.publish(all_repos)
+            self.snapshot = Snapshot(published, markdown, datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"))
+            self.digest = digest
+            self.publishes += 1
+            if self.settings['regenerate_website']:
+                with curator.metrics.span('website'):
+                    self._regenerate_website()
+            logger.info(f"Published {len(published)} repositories after refreshing {len(due)} queries")
+        else:
+            logger.info(f"Refreshed {len(due)} queries; ranked list unchanged, outputs left as they are")
+        curator.save_response_cache()
+        curator.metrics.incr('daemon_publishes' if changed else 'daemon_unchanged')
+        curator.finish_cycle()
+        return changed
+
+    def _regenerate_website(self):
+        # Imported on first use; the incremental build only rewrites changed files
+        from generate_website import generate_website
+        generate_website(self.curator.config_path)
+
+    def status(self) -> Dict:
+        """Schedule and publish state for the /status endpoint"""
+        now = time.time()
+        queries = {}
+        for query, effective_query in self._effective_queries.items():
+            entry = self.query_cache.get(effective_query)
+            next_run = self.schedule.next_run.get(effective_query)
+            queries[query] = {
+                'interval_minutes': round(self.schedule.interval(query) / 60, 1),
+                'age_seconds': round(now - entry['timestamp']) if entry else None,
+                'next_refresh_in_seconds': max(0, round(next_run - now)) if next_run else None,
+                'repositories': len(entry['repositories']) if entry else 0,
+            }
+        return {
+            'uptime_seconds': round(now - self.started_at),
+            'cycles': self.cycles,
+            'publishes': self.publishes,
+            'generated': self.snapshot.generated if self.snapshot else None,
+            'rate_limit_remaining': self.curator.rate_limit_remaining,
+            'queries': queries,
+        }
+
+    def start_server(self, host: Optional[str] = None, port: Optional[int] = None) -> ThreadingHTTPServer:
+        """Serve snapshots from a background thread"""
+        self.server = ThreadingHTTPServer((host or self.settings['host'], int(port or self.settings['port'])), SnapshotHandler)
+        self.server.curator_daemon = self
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='curator-http', daemon=True).start()
+        logger.info(f"Serving on http://{self.server.server_address[0]}:{self.server.server_address[1]}/")
+        return self.server
+
+    def serve_forever(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Load the cache once, start the HTTP server and tick until stop() or Ctrl+C"""
+        with self.curator.metrics.span('cache_load'):
+            self.query_cache = self.curator.load_cache()
+        self.start_server(host, port)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.tick()
+                except TokenRejectedError:
+                    # A rejected token will not fix itself
+                    raise
+                except Exception as e:
+                    logger.error(f"Refresh cycle failed: {e}", exc_info=True)
+                self._stop.wait(float(self.settings['tick_seconds']))
+        except KeyboardInterrupt:
+            logger.info("Stopping curator daemon")
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stop(self):
+        self._stop.set()
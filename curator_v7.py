@@ -1,31 +1,57 @@
-import requests
 import os
 import json
+import gzip
+import re
+import sys
 import time
-from datetime import datetime
-from typing import List, Dict, Optional
+import heapq
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from urllib.parse import urlencode
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('curator.log'),
-        logging.StreamHandler()
-    ]
-)
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib json module is the fallback
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # Optional; RelevanceScorer falls back to a pure-Python pass
+    np = None
+
+from enrichment import DEFAULT_SETTINGS as ENRICHMENT_DEFAULTS, REQUESTS_PER_REPO, fetch_details, is_stale
+from json_stream import JSONStreamReader
+from metrics import RunMetrics
+from near_duplicates import collapse, repo_tokens
+from query_planner import (DEFAULT_SETTINGS as PLANNER_DEFAULTS, MAX_QUERY_LENGTH, PlannedSearch, attribute,
+                           is_mergeable, plan_searches)
+from repo_store import RepoStore, utc_day
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+def configure_logging(log_file: Optional[str] = 'curator.log', level: int = logging.INFO):
+    """Log to stderr and a file; the script opts in, library callers keep their own logging setup"""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(level=level, format='%(asctime)s - %(levelname)s - %(message)s', handlers=handlers)
+
+class TokenRejectedError(ValueError):
+    """GitHub answered 401: the token is invalid or revoked, and retrying will not help"""
+
+
+@dataclass(slots=True)
 class RepoInfo:
-    """Data class for repository information"""
+    """Slotted data class for repository information with interned shared strings"""
     name: str
     full_name: str
     html_url: str
@@ -37,6 +63,7 @@ class RepoInfo:
     license_name: Optional[str]
     is_fork: bool = False
     size_kb: int = 0
+    pushed_at: str = ''
 
     @classmethod
     def from_github_api(cls, repo_data: Dict) -> 'RepoInfo':
@@ -52,29 +79,644 @@ class RepoInfo:
             topics=repo_data.get('topics', []),
             license_name=repo_data.get('license', {}).get('name') if repo_data.get('license') else None,
             is_fork=repo_data.get('fork', False),
-            size_kb=repo_data.get('size', 0)
+            size_kb=repo_data.get('size', 0),
+            pushed_at=repo_data.get('pushed_at') or ''
         )
 
+    def __post_init__(self):
+        # Languages, licenses and topics repeat across thousands of repos
+        if self.language:
+            self.language = sys.intern(self.language)
+        if self.license_name:
+            self.license_name = sys.intern(self.license_name)
+        self.topics = [sys.intern(topic) for topic in self.topics]
+
+    def to_row(self) -> tuple:
+        """Positional row in REPO_FIELDS order, without asdict's deep copy"""
+        return (self.name, self.full_name, self.html_url, self.description, self.stars, self.language,
+                self.last_updated, self.topics, self.license_name, self.is_fork, self.size_kb, self.pushed_at)
+
+    @classmethod
+    def from_row(cls, row) -> 'RepoInfo':
+        return cls(*row)
+
+    def to_dict(self) -> Dict:
+        return dict(zip(REPO_FIELDS, self.to_row()))
+
+REPO_FIELDS = tuple(f.name for f in fields(RepoInfo))
+CACHE_FORMAT = 'rows-v1'
+
+def _dump_json(data, filename: str):
+    """Write compact JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+@dataclass
+class QueryProgress:
+    """Pagination state and yield statistics for one search query"""
+    query: str
+    max_pages: int
+    per_page: int = 100
+    max_repos: int = 0
+    # Off for searches whose results are attributed and truncated afterwards; only survivors count toward top N
+    feeds_threshold: bool = True
+    pages_fetched: int = 0
+    items_seen: int = 0
+    accepted: int = 0
+    total_count: Optional[int] = None
+    stop_reason: str = ''
+    lowest_stars: Optional[int] = None
+    page_yields: List[float] = field(default_factory=list)
+
+    @property
+    def pages_available(self) -> int:
+        """Pages a non-adaptive walk would request, given GitHub's 1000-result cap"""
+        if self.total_count is None:
+            return self.pages_fetched
+        reachable = min(self.total_count, 1000)
+        return min(self.max_pages, math.ceil(reachable / self.per_page))
+
+    @property
+    def pages_saved(self) -> int:
+        return max(0, self.pages_available - self.pages_fetched)
+
+    @property
+    def requests(self) -> int:
+        """Search calls made, including the empty page that ended the walk"""
+        return self.pages_fetched + (self.stop_reason == 'empty')
+
+class RankThreshold:
+    """Tracks the N-th best rank key among unique accepted repositories across queries"""
+
+    def __init__(self, size: int, rank_key: Callable[[RepoInfo], Tuple]):
+        self.size = size
+        self.rank_key = rank_key
+        self._heap: List[Tuple] = []
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, repos: List[RepoInfo]):
+        with self._lock:
+            for repo in repos:
+                if repo.html_url in self._seen:
+                    continue
+                self._seen.add(repo.html_url)
+                key = self.rank_key(repo)
+                if len(self._heap) < self.size:
+                    heapq.heappush(self._heap, key)
+                elif key > self._heap[0]:
+                    heapq.heapreplace(self._heap, key)
+
+    def excludes(self, best_possible_key: Tuple) -> bool:
+        """True once a repo ranked at best_possible_key could no longer enter the top N"""
+        with self._lock:
+            return len(self._heap) >= self.size and self._heap[0] > best_possible_key
+
+class RateLimitScheduler:
+    """Token bucket shared by worker threads, re-synced from GitHub rate-limit headers"""
+
+    def __init__(self, capacity: int = 30, period_seconds: float = 60.0):
+        self.capacity = max(1, capacity)
+        self.refill_rate = self.capacity / period_seconds
+        self.tokens = float(self.capacity)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+        if self.blocked_until and time.time() >= self.blocked_until:
+            # The quota window has rolled over, so the full budget is available again
+            self.blocked_until = 0.0
+            self.tokens = float(self.capacity)
+
+    def acquire(self):
+        """Block until a request slot is available within the current budget"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.blocked_until:
+                    wait = self.blocked_until - time.time()
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.refill_rate
+            time.sleep(max(wait, 0.01))
+
+    def release(self, remaining: Optional[int] = None, reset_at: Optional[float] = None):
+        """Return a slot and clamp the bucket to the quota GitHub reports as remaining"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if remaining is None:
+                return
+            # Requests still in flight will consume quota the header does not reflect yet
+            self.tokens = min(self.tokens, float(remaining - self.in_flight))
+            if remaining <= 0 and reset_at:
+                self.blocked_until = max(self.blocked_until, float(reset_at))
+
+    def pause_until(self, until: float):
+        """Hold every worker until an epoch time, e.g. one given by Retry-After"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, until)
+
+class CircuitBreaker:
+    """Fail fast after consecutive request failures, letting one probe through after a cooldown"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        # Thread id of the half-open probe; nobody else gets through until it reports back
+        self._probe: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probe is not None or time.monotonic() - self.opened_at < self.cooldown_seconds:
+                return False
+            self._probe = threading.get_ident()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self._probe == threading.get_ident():
+                self._probe = None
+                self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe == threading.get_ident():
+                # The probe failed: stay open for another cooldown
+                self._probe = None
+                self.opened_at = time.monotonic()
+                self.trips += 1
+            elif self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                self.trips += 1
+
+    def end_probe(self):
+        """Free the probe slot when a probe ended without a verdict, e.g. rate limited"""
+        with self._lock:
+            if self._probe == threading.get_ident():
+                self._probe = None
+
+# Exactly the fields RepoInfo.from_github_api reads from a REST search item
+GRAPHQL_REPO_FIELDS = """
+      name
+      nameWithOwner
+      url
+      description
+      stargazerCount
+      primaryLanguage { name }
+      updatedAt
+      repositoryTopics(first: 20) { nodes { topic { name } } }
+      licenseInfo { name }
+      isFork
+      diskUsage
+      pushedAt
+    """
+
+class RepoFilter:
+    """Filter configuration compiled once per run into an ordered predicate chain"""
+
+    GENERIC_NAMES = ('awesome', 'list', 'collection', 'resources')
+    ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+    def __init__(self, config: Dict):
+        filters = config.get('filters', {})
+        advanced = config.get('advanced_options', {})
+
+        min_stars = int(filters.get('min_stars', 0))
+        min_size_kb = int(filters.get('min_size', 0))
+        languages = frozenset(filters.get('languages', []))
+        max_age_days = int(advanced.get('min_last_update_days', 365))
+        # A YYYY-MM-DD date is recent enough iff it sorts at or after this cutoff
+        cutoff = (datetime.utcnow().date() - timedelta(days=max_age_days)).isoformat()
+        keywords = [keyword.lower() for keyword in filters.get('exclude_keywords', []) if keyword]
+        keyword_re = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+        self.generic_name_re = re.compile('|'.join(map(re.escape, self.GENERIC_NAMES)))
+
+        # Cheapest checks first; every stage must pass
+        stages: List[Tuple[str, Callable[[RepoInfo], bool]]] = []
+        if min_stars > 0:
+            stages.append(('min_stars', lambda repo: repo.stars >= min_stars))
+        if min_size_kb > 0:
+            stages.append(('min_size', lambda repo: repo.size_kb >= min_size_kb))
+        if not advanced.get('include_forks', False):
+            stages.append(('fork', lambda repo: not repo.is_fork))
+        if advanced.get('require_license', False):
+            stages.append(('license', lambda repo: bool(repo.license_name)))
+        if languages:
+            stages.append(('language', lambda repo: repo.language in languages))
+        stages.append(('recency', lambda repo: repo.last_updated >= cutoff and bool(self.ISO_DATE.match(repo.last_updated))))
+        if keyword_re is not None:
+            stages.append(('exclude_keywords', lambda repo: not keyword_re.search(f"{repo.name} {repo.description or ''}".lower())))
+        self.stages = stages
+
+        self.rejections = Counter()
+        self.checked = 0
+        self.accepted = 0
+        self._lock = threading.Lock()
+
+    def _quality_rejection(self, repo: RepoInfo) -> Optional[str]:
+        """Generic names and thin descriptions are only kept for well-starred repos"""
+        if self.generic_name_re.search(repo.name.lower()):
+            return None if repo.stars > 1000 else 'generic_name'
+        if not repo.description or len(repo.description) < 20:
+            return None if repo.stars > 100 else 'short_description'
+        return None
+
+    def __call__(self, repo: RepoInfo) -> bool:
+        rejection = None
+        for name, predicate in self.stages:
+            if not predicate(repo):
+                rejection = name
+                break
+        else:
+            rejection = self._quality_rejection(repo)
+
+        with self._lock:
+            self.checked += 1
+            if rejection:
+                self.rejections[rejection] += 1
+            else:
+                self.accepted += 1
+        return rejection is None
+
+    def summary(self) -> str:
+        """One-line report of how many repos each stage dropped"""
+        dropped = ', '.join(f"{name}={count}" for name, count in self.rejections.most_common())
+        return f"Filter accepted {self.accepted}/{self.checked} repositories; rejected by {dropped or 'none'}"
+
+class RelevanceScorer:
+    """Weighted relevance over topic matches, log-stars, recency, query hits and star velocity
+
+    Preferred topics are mapped to a vocabulary index once per run, and a whole
+    collection is scored in one batched pass, vectorized when NumPy is installed.
+    The default weights reproduce the old (preference score, stars) order.
+    """
+
+    DEFAULT_WEIGHTS = {'topics': 10.0, 'stars': 1.0, 'recency': 0.0, 'query_hits': 0.0, 'velocity': 0.0}
+
+    def __init__(self, config: Dict, rank_by: str = 'stars', today: Optional[date] = None):
+        advanced = config.get('advanced_options', {})
+        weights = dict(self.DEFAULT_WEIGHTS)
+        if rank_by == 'velocity':
+            # Growth takes the place of raw stars, ordering like (preference, velocity, stars)
+            weights.update(stars=0.0, velocity=1.0)
+        configured = advanced.get('ranking_weights', {})
+        unknown = set(configured) - set(self.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown ranking_weights: {', '.join(sorted(unknown))}")
+        weights.update({name: float(value) for name, value in configured.items()})
+        self.weights = weights
+        self.half_life_days = max(1.0, float(advanced.get('recency_half_life_days', 90)))
+        self.today = (today or datetime.utcnow().date()).toordinal()
+        self.query_count = len(config.get('search_queries', []))
+
+        # A topic listed twice in prefer_topics counts twice, as it always has
+        self.vocabulary: Dict[str, int] = {}
+        self.topic_weights: List[float] = []
+        for topic in advanced.get('prefer_topics', []):
+            index = self.vocabulary.setdefault(topic.lower(), len(self.vocabulary))
+            if index == len(self.topic_weights):
+                self.topic_weights.append(0.0)
+            self.topic_weights[index] += 1.0
+
+    def _topic_indexes(self, repo: RepoInfo) -> set:
+        vocabulary = self.vocabulary
+        return {vocabulary[topic.lower()] for topic in repo.topics if topic.lower() in vocabulary}
+
+    def _recency(self, last_updated: str) -> float:
+        """1.0 for a repository pushed today, halving every half_life_days"""
+        try:
+            age_days = self.today - date.fromisoformat(last_updated[:10]).toordinal()
+        except (TypeError, ValueError):
+            return 0.0
+        return 0.5 ** (max(age_days, 0) / self.half_life_days)
+
+    def score_one(self, repo: RepoInfo, query_hits: int = 0, velocity: float = 0.0) -> float:
+        """Score a single repository, for incremental users such as RankThreshold"""
+        weights = self.weights
+        score = weights['topics'] * sum(self.topic_weights[index] for index in self._topic_indexes(repo))
+        score += weights['stars'] * math.log10(1 + repo.stars)
+        if weights['recency']:
+            score += weights['recency'] * self._recency(repo.last_updated)
+        score += weights['query_hits'] * query_hits
+        score += weights['velocity'] * math.log10(1 + max(velocity, 0.0))
+        return score
+
+    def score(self, repos: List[RepoInfo], query_hits: List[int], velocities: List[float]) -> List[float]:
+        """Score every repository in one pass; inputs are aligned with repos"""
+        if np is None:
+            return [self.score_one(repo, hits, velocity) for repo, hits, velocity in zip(repos, query_hits, velocities)]
+
+        count = len(repos)
+        weights = self.weights
+        rows, columns = [], []
+        for row, repo in enumerate(repos):
+            for index in self._topic_indexes(repo):
+                rows.append(row)
+                columns.append(index)
+        topic_weights = np.asarray(self.topic_weights, dtype=float)
+        scores = weights['topics'] * np.bincount(
+            np.asarray(rows, dtype=np.intp), weights=topic_weights[np.asarray(columns, dtype=np.intp)], minlength=count
+        )
+        scores += weights['stars'] * np.log10(1 + np.fromiter((repo.stars for repo in repos), dtype=float, count=count))
+        if weights['recency']:
+            scores += weights['recency'] * np.fromiter(
+                (self._recency(repo.last_updated) for repo in repos), dtype=float, count=count
+            )
+        scores += weights['query_hits'] * np.asarray(query_hits, dtype=float)
+        scores += weights['velocity'] * np.log10(1 + np.maximum(np.asarray(velocities, dtype=float), 0.0))
+        return scores.tolist()
+
+    def upper_bound(self, stars: int) -> float:
+        """Highest score any repository with at most this many stars could reach"""
+        weights = self.weights
+        bound = sum(max(weights['topics'] * weight, 0.0) for weight in self.topic_weights)
+        bound += max(weights['stars'] * math.log10(1 + stars), 0.0)
+        bound += max(weights['recency'], 0.0)
+        bound += max(weights['query_hits'], 0.0) * self.query_count
+        if weights['velocity'] > 0:
+            # Growth is not bounded by the star count
+            bound = math.inf
+        return bound
+
+class RepoAnalytics:
+    """Streaming collection statistics: heap-based top-K plus Counter tallies, fed one repo at a time
+
+    Exact star percentiles are the one stat not bounded by K: they keep a
+    Counter of star counts, so memory grows with the number of distinct
+    counts (a few thousand for a typical collection, at most n) and result()
+    sorts only those.
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, top_starred: int = 20, recent: int = 10):
+        self.top_starred_size = top_starred
+        self.recent_size = recent
+        self.total_repos = 0
+        self.total_stars = 0
+        self.languages = Counter()
+        self.topics = Counter()
+        self.licenses = Counter()
+        self.language_stars = Counter()
+        self.star_counts = Counter()
+        self._top_starred: List[Tuple] = []
+        self._recent: List[Tuple] = []
+
+    @staticmethod
+    def _push(heap: List[Tuple], size: int, entry: Tuple):
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, repo: RepoInfo):
+        # The negated arrival index breaks ties in favour of earlier repos, like a stable sort
+        order = -self.total_repos
+        self.total_repos += 1
+        self.total_stars += repo.stars
+        self.star_counts[repo.stars] += 1
+        self.languages[repo.language] += 1
+        self.language_stars[repo.language] += repo.stars
+        self.topics.update(repo.topics)
+        if repo.license_name:
+            self.licenses[repo.license_name] += 1
+        self._push(self._top_starred, self.top_starred_size, (repo.stars, order, repo))
+        self._push(self._recent, self.recent_size, (repo.last_updated, order, repo))
+
+    def _star_percentiles(self) -> Dict[int, int]:
+        """Nearest-rank percentiles, walking the distinct star counts in ascending order"""
+        ranks = {p: max(1, math.ceil(p / 100 * self.total_repos)) for p in self.PERCENTILES}
+        percentiles = {}
+        seen = 0
+        for stars in sorted(self.star_counts):
+            seen += self.star_counts[stars]
+            for p, rank in ranks.items():
+                if p not in percentiles and seen >= rank:
+                    percentiles[p] = stars
+        return percentiles
+
+    def result(self) -> Dict:
+        if not self.total_repos:
+            return {}
+        return {
+            'total_repos': self.total_repos,
+            'total_stars': self.total_stars,
+            'languages': self.languages,
+            'topics': self.topics,
+            'licenses': self.licenses,
+            'language_stars': self.language_stars,
+            'star_percentiles': self._star_percentiles(),
+            'recent_repos': [entry[2] for entry in sorted(self._recent, reverse=True)],
+            'top_starred': [entry[2] for entry in sorted(self._top_starred, reverse=True)]
+        }
+
+# The recency qualifier moves every day; keying on its date would never revalidate (cf. http_replay.fixture_key)
+PUSHED_DATE_RE = re.compile(r'pushed:>=\d{4}-\d{2}-\d{2}')
+
+class ResponseCache:
+    """Persistent on-disk cache of API responses revalidated with ETag / Last-Modified"""
+
+    def __init__(self, filename: str = 'http_cache.json.gz', max_age_days: int = 7):
+        self.filename = filename
+        self.max_age_seconds = max_age_days * 86400
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read the cache file on first use, so runs that never hit the API skip it"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not Path(self.filename).exists():
+            return
+        try:
+            with gzip.open(self.filename, 'rt', encoding='utf-8') as f:
+                self.entries = json.load(f)
+            logger.info(f"Loaded {len(self.entries)} cached API responses")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load HTTP cache: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def make_key(url: str, params: Dict = None) -> str:
+        """Build a stable key from the URL and sorted query parameters, ignoring the pushed:>= date
+
+        A body cached under yesterday's date is only reused when GitHub answers
+        today's request with a 304 for the same ETag, i.e. identical results.
+        """
+        items = sorted((name, PUSHED_DATE_RE.sub('pushed:>=*', value) if isinstance(value, str) else value)
+                       for name, value in (params or {}).items())
+        return f"{url}?{urlencode(items)}"
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Validators to send so the server can answer 304 Not Modified"""
+        with self._lock:
+            self._load()
+            entry = self.entries.get(key)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def hit(self, key: str) -> Optional[Dict]:
+        """Return the cached body for a 304 response"""
+        with self._lock:
+            self._load()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.hits += 1
+            self.bytes_saved += entry.get('size', 0)
+            entry['stored_at'] = time.time()
+            return entry['body']
+
+    def store(self, key: str, response, body: Dict):
+        """Record a fresh 200 response if it carries validators"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            self._load()
+            self.misses += 1
+            if not etag and not last_modified:
+                return
+            self.entries[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(response.content),
+                'stored_at': time.time(),
+                'body': body
+            }
+
+    def save(self):
+        """Write the cache, dropping entries not revalidated recently"""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            if not self._loaded:
+                # No request consulted the cache this run, so the file is already current
+                return
+            self.entries = {key: entry for key, entry in self.entries.items() if entry.get('stored_at', 0) >= cutoff}
+            with gzip.open(self.filename, 'wt', encoding='utf-8') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+        logger.info(f"HTTP cache: {self.hits} hits, {self.misses} misses, {self.bytes_saved:,} bytes saved")
+
 class GitHubCurator:
     """Enhanced GitHub repository curator with improved functionality"""
+
+    RETRY_STATUSES = frozenset({500, 502, 503, 504})
     
-    def __init__(self, config_path: str = 'config.json'):
-        """Initialize curator with configuration"""
+    def __init__(self, config_path: str = 'config.json', session=None):
+        """Initialize curator with configuration; session replaces the HTTP transport"""
+        self.config_path = config_path
         self.config = self._load_config(config_path)
         self.api_url = "https://api.github.com"
         self.headers = {
             "Authorization": f"token {self.config['github_token']}",
             "Accept": "application/vnd.github.v3+json"
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        advanced = self.config.get('advanced_options', {})
+        self.max_workers = max(1, int(advanced.get('max_workers', 1)))
+        self.http_mode = advanced.get('http_mode', 'live')
+        if self.http_mode not in ('live', 'record', 'replay'):
+            raise ValueError(f"Unknown http_mode: {self.http_mode}")
+        self._session = session
+        if session is not None:
+            session.headers.update(self.headers)
+        self._session_lock = threading.Lock()
+        self.token_validated = False
         self.rate_limit_remaining = 5000  # GitHub default
         self.rate_limit_reset = time.time()
+        self.rate_limiter = RateLimitScheduler(int(advanced.get('search_requests_per_minute', 30)))
+        self.enrichment = dict(ENRICHMENT_DEFAULTS, **advanced.get('enrichment', {}))
+        # Per-repository endpoints draw on the core quota, not the search one
+        self.core_rate_limiter = RateLimitScheduler(int(self.enrichment['requests_per_minute']))
+        self.max_retries = max(0, int(advanced.get('max_retries', 3)))
+        self.retry_backoff = float(advanced.get('retry_backoff_seconds', 1.0))
+        self.retry_max_backoff = float(advanced.get('retry_max_backoff_seconds', 60.0))
+        self.circuit_breaker = CircuitBreaker(
+            int(advanced.get('circuit_breaker_threshold', 5)),
+            float(advanced.get('circuit_breaker_cooldown_seconds', 60.0))
+        )
+        self.response_cache = None
+        if self.config.get('enable_caching') and advanced.get('http_cache_file', 'http_cache.json.gz'):
+            self.response_cache = ResponseCache(
+                advanced.get('http_cache_file', 'http_cache.json.gz'),
+                int(advanced.get('http_cache_max_age_days', 7))
+            )
+        self.repo_filter = RepoFilter(self.config)
+        self.rank_by = advanced.get('rank_by', 'stars')
+        if self.rank_by not in ('stars', 'velocity'):
+            raise ValueError(f"Unknown rank_by: {self.rank_by}")
+        self.star_velocity: Dict[str, float] = {}
+        self.scorer = RelevanceScorer(self.config, self.rank_by)
+        self.rank_threshold: Optional[RankThreshold] = None
+        self.query_progress: Dict[str, QueryProgress] = {}
+        self.query_planner = dict(PLANNER_DEFAULTS, **advanced.get('query_planner', {}))
+        # What each configured query's last fetch saw, keyed by the query as configured
+        self.query_stats: Dict[str, Dict] = {}
+        self.metrics = RunMetrics('curator')
         
-        self._validate_token()
+        # By default the token is checked on the first real response instead of a /user round trip
+        if advanced.get('validate_token_on_start', False) and self.http_mode != 'replay':
+            self._validate_token()
+
+    @property
+    def session(self):
+        """HTTP transport, built on first use so cache-served runs never import requests"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session(self.config.get('advanced_options', {}))
+        return self._session
+
+    def _build_session(self, advanced: Dict):
+        """Live requests session, or a record/replay transport for offline runs"""
+        import requests
+        from http_replay import RecordingSession, ReplaySession
+
+        fixtures_dir = advanced.get('fixtures_dir', 'fixtures')
+        if self.http_mode == 'replay':
+            session = ReplaySession(fixtures_dir)
+        elif self.http_mode == 'record':
+            session = RecordingSession(fixtures_dir, requests.Session())
+        else:
+            session = requests.Session()
+        session.headers.update(self.headers)
+        if self.max_workers > 1:
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+            session.mount('https://', adapter)
+        return session
         
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from file or environment"""
+        # Load environment variables from .env file
+        load_dotenv()
         default_config = {
             'github_token': os.getenv('GITHUB_TOKEN'),
             'username': os.getenv('GITHUB_USERNAME', 'hexacron'),
@@ -105,7 +747,9 @@ class GitHubCurator:
             'output_format': 'markdown',
             'max_repos_per_query': 50,
             'enable_caching': True,
-            'cache_duration_hours': 24
+            'cache_duration_hours': 24,
+            'max_total_repos': 0,
+            'store_path': 'repositories.db'
         }
         
         if Path(config_path).exists():
@@ -125,7 +769,11 @@ class GitHubCurator:
                     logger.warning(f"Could not decode {config_path}. Using defaults.")
         
         if not default_config['github_token']:
-            raise ValueError("GitHub token not found. Set GITHUB_TOKEN environment variable or add to config.json")
+            if default_config.get('advanced_options', {}).get('http_mode') == 'replay':
+                # Fixtures already hold the responses; the token is never sent anywhere
+                default_config['github_token'] = 'replay'
+            else:
+                raise ValueError("GitHub token not found. Set GITHUB_TOKEN environment variable or add to config.json")
 
         search_queries = default_config.get('search_queries', [])
         default_config['search_queries'] = list(dict.fromkeys(query.strip() for query in search_queries if query.strip()))
@@ -134,35 +782,157 @@ class GitHubCurator:
     
     def _validate_token(self):
         """Validate GitHub token before proceeding"""
+        import requests
+
         try:
             response = self.session.get(f"{self.api_url}/user", timeout=30)
             if response.status_code == 200:
                 user_data = response.json()
+                self.token_validated = True
                 logger.info(f"✅ Authenticated as: {user_data.get('login')}")
                 logger.info(f"Rate limit: {response.headers.get('X-RateLimit-Remaining')}/{response.headers.get('X-RateLimit-Limit')}")
             elif response.status_code == 401:
-                raise ValueError("Invalid GitHub token. Please check your token and permissions.")
+                raise TokenRejectedError("Invalid GitHub token. Please check your token and permissions.")
             else:
                 logger.warning(f"Token validation returned: {response.status_code}")
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to validate GitHub token: {e}")
     
-    def _make_api_request(self, url: str, params: Dict = None) -> Optional[Dict]:
-        """Make API request with rate limiting and error handling"""
+    def _make_api_request(self, url: str, params: Dict = None, json_body: Dict = None,
+                          limiter: Optional[RateLimitScheduler] = None, allow_missing: bool = False) -> Optional[Dict]:
+        """Make API request with rate limiting, retries and error handling; a json_body makes it a POST
+
+        limiter paces the request, the search scheduler by default. With
+        allow_missing, a 404 or 204 returns {} rather than None, for optional
+        resources such as a repository's latest release.
+        """
+        limiter = limiter or self.rate_limiter
+        for attempt in range(self.max_retries + 1):
+            if not self.circuit_breaker.allow():
+                self.metrics.incr('circuit_open_rejections')
+                logger.error(f"Circuit breaker open after repeated failures, skipping {url}")
+                return None
+            data, retry_in = self._attempt_request(url, params, json_body, attempt, limiter, allow_missing)
+            if retry_in is None:
+                return data
+            if attempt < self.max_retries:
+                self.metrics.incr('retries')
+                logger.warning(f"Retrying {url} in {retry_in:.1f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+                self._sleep(retry_in)
+        self.metrics.incr('requests_failed')
+        logger.error(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter so workers do not retry in lockstep"""
+        delay = min(self.retry_max_backoff, self.retry_backoff * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _is_rate_limited(response) -> bool:
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and (
+            'Retry-After' in response.headers
+            or response.headers.get('X-RateLimit-Remaining') == '0'
+            or 'rate limit' in response.text.lower()
+        )
+
+    def _rate_limit_delay(self, response, attempt: int, limiter: RateLimitScheduler) -> float:
+        """Pause every worker for as long as GitHub asks; the retry then waits in acquire()"""
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                limiter.pause_until(time.time() + float(retry_after))
+                return 0.0
+            except ValueError:
+                pass
+        if response.headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in response.headers:
+            # release() has already blocked the scheduler until the reset time
+            return 0.0
+        # Secondary limits without headers: GitHub asks for at least a minute
+        limiter.pause_until(time.time() + max(60.0, self._backoff_delay(attempt)))
+        return 0.0
+
+    def _attempt_request(self, url: str, params: Optional[Dict], json_body: Optional[Dict], attempt: int,
+                         limiter: RateLimitScheduler, allow_missing: bool = False) -> Tuple[Optional[Dict], Optional[float]]:
+        """One request; returns (data, None) when done or (None, seconds) when it should be retried"""
+        import requests
+
+        with self.metrics.span('rate_limit_wait'):
+            limiter.acquire()
+        remaining, reset_at = None, None
+        cache_key = None
+        request_headers = None
+        if self.response_cache is not None and json_body is None:
+            cache_key = self.response_cache.make_key(url, params)
+            request_headers = self.response_cache.conditional_headers(cache_key) or None
         try:
-            response = self.session.get(url, params=params, timeout=30)
+            self.metrics.incr('requests')
+            with self.metrics.span('api_request'):
+                if json_body is not None:
+                    response = self.session.post(url, json=json_body, timeout=30)
+                else:
+                    response = self.session.get(url, params=params, headers=request_headers, timeout=30)
+            self.metrics.incr(f"responses_{response.status_code // 100}xx" if response.status_code != 304 else 'responses_304')
+            if response.status_code == 401:
+                raise TokenRejectedError("Invalid GitHub token. Please check your token and permissions.")
+            # Only a served request proves the token; a 5xx or a forbidden resource says nothing about it
+            if not self.token_validated and (200 <= response.status_code < 300 or response.status_code == 304):
+                self.token_validated = True
+                logger.info(f"✅ Token accepted; rate limit: {response.headers.get('X-RateLimit-Remaining')}/{response.headers.get('X-RateLimit-Limit')}")
             
-            self.rate_limit_remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-            self.rate_limit_reset = int(response.headers.get('X-RateLimit-Reset', time.time()))
+            if 'X-RateLimit-Remaining' in response.headers:
+                remaining = int(response.headers['X-RateLimit-Remaining'])
+                reset_at = int(response.headers.get('X-RateLimit-Reset', time.time()))
+                self.rate_limit_remaining = remaining
+                self.rate_limit_reset = reset_at
+                self.metrics.gauge('rate_limit_remaining', remaining)
             
+            if response.status_code == 304 and cache_key:
+                cached = self.response_cache.hit(cache_key)
+                if cached is not None:
+                    self.circuit_breaker.record_success()
+                    return cached, None
             if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"API request failed with status {response.status_code}: {response.text}")
-                return None
+                data = response.json()
+                if cache_key:
+                    self.response_cache.store(cache_key, response, data)
+                self.circuit_breaker.record_success()
+                return data, None
+            if self._is_rate_limited(response):
+                self.metrics.incr('rate_limited')
+                logger.warning(f"Rate limited ({response.status_code}) on {url}")
+                return None, self._rate_limit_delay(response, attempt, limiter)
+            if allow_missing and response.status_code in (204, 404):
+                self.circuit_breaker.record_success()
+                logger.debug(f"Nothing at {url} ({response.status_code})")
+                return {}, None
+            if response.status_code in self.RETRY_STATUSES:
+                self.circuit_breaker.record_failure()
+                logger.warning(f"API request failed with status {response.status_code}, will retry")
+                return None, self._backoff_delay(attempt)
+            logger.error(f"API request failed with status {response.status_code}: {response.text}")
+            return None, None
         except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
+            self.metrics.incr('request_errors')
+            self.circuit_breaker.record_failure()
+            logger.warning(f"API request failed: {e}")
+            return None, self._backoff_delay(attempt)
+        finally:
+            self.circuit_breaker.end_probe()
+            limiter.release(remaining, reset_at)
+
+    def _make_graphql_request(self, query: str, variables: Dict) -> Optional[Dict]:
+        """Run a GraphQL query, returning its data or None when GitHub reports errors"""
+        payload = self._make_api_request(f"{self.api_url}/graphql", json_body={'query': query, 'variables': variables})
+        if payload is None:
             return None
+        if payload.get('errors'):
+            logger.error(f"GraphQL request returned errors: {payload['errors']}")
+            if not payload.get('data'):
+                return None
+        return payload.get('data')
 
     def _build_search_query(self, query: str) -> str:
         """Push supported filters into the GitHub search query to reduce wasted pages."""
@@ -185,23 +955,57 @@ class GitHubCurator:
         if 'archived:' not in query_lower:
             effective_query += " archived:false"
 
-        max_age_days = int(advanced.get('min_last_update_days', 365))
-        if max_age_days > 0 and 'pushed:' not in query_lower:
-            pushed_after = datetime.utcnow().date().fromordinal(
-                datetime.utcnow().date().toordinal() - max_age_days
-            )
+        pushed_after = self._pushed_after()
+        if pushed_after is not None and 'pushed:' not in query_lower:
             effective_query += f" pushed:>={pushed_after.isoformat()}"
 
         return effective_query
+
+    def _pushed_after(self) -> Optional[date]:
+        """Oldest last-push date a repository may have, from min_last_update_days"""
+        max_age_days = int(self.config.get('advanced_options', {}).get('min_last_update_days', 365))
+        if max_age_days <= 0:
+            return None
+        return datetime.utcnow().date().fromordinal(datetime.utcnow().date().toordinal() - max_age_days)
     
-    def search_repositories(self, query: str) -> List[RepoInfo]:
-        """Search GitHub repositories with enhanced filtering"""
+    def _pagination_stop_reason(self, progress: QueryProgress, items: List[Dict]) -> Optional[str]:
+        """Decide whether later pages of a stars-desc search can still change the output"""
+        advanced = self.config.get('advanced_options', {})
+        if len(items) < progress.per_page:
+            return 'exhausted'
+        if progress.total_count is not None and progress.pages_fetched >= progress.pages_available:
+            return 'exhausted' if progress.pages_available < progress.max_pages else 'max_pages'
+        if progress.accepted >= progress.max_repos:
+            return 'quota'
+
+        # Results are sorted by stars, so nothing on later pages outranks the last item
+        lowest_stars = items[-1].get('stargazers_count', 0)
+        if lowest_stars < int(self.config.get('filters', {}).get('min_stars', 0)):
+            return 'below_min_stars'
+        if self.rank_threshold is not None and self.rank_threshold.excludes(self._rank_upper_bound(lowest_stars)):
+            return 'below_top_n'
+
+        min_page_yield = float(advanced.get('min_page_yield', 0))
+        if min_page_yield > 0 and progress.page_yields[-1] < min_page_yield:
+            return 'low_yield'
+        return None
+
+    def search_repositories(self, query: str, max_repos: Optional[int] = None,
+                            feeds_threshold: bool = True) -> List[RepoInfo]:
+        """Search GitHub repositories with enhanced filtering and adaptive pagination
+
+        max_repos overrides max_repos_per_query, e.g. for a search serving several queries,
+        and feeds_threshold=False keeps its results out of the top-N threshold.
+        """
         repos = []
         seen_urls = set()
         page = 1
-        max_pages = 5
-        api_delay = float(self.config.get('advanced_options', {}).get('api_delay_seconds', 1.0))
+        advanced = self.config.get('advanced_options', {})
+        per_page = 100
+        max_pages = min(int(advanced.get('max_pages', 5)), 1000 // per_page)
+        max_repos = max_repos or self.config['max_repos_per_query']
         effective_query = self._build_search_query(query)
+        progress = QueryProgress(effective_query, max_pages, per_page, max_repos, feeds_threshold)
         
         while page <= max_pages:
             params = {
@@ -209,118 +1013,238 @@ class GitHubCurator:
                 'sort': 'stars',
                 'order': 'desc',
                 'page': page,
-                'per_page': 100
+                'per_page': per_page
             }
             logger.info(f"Searching repositories: page {page}, query: {effective_query}")
             
             data = self._make_api_request(f"{self.api_url}/search/repositories", params)
             
-            if not data or not data.get('items'):
+            if data is None:
+                # Retries ran out; keep what we have but do not mistake it for the end of the results
+                progress.stop_reason = 'failed'
+                break
+            if not data.get('items'):
+                progress.stop_reason = progress.stop_reason or 'empty'
+                break
+
+            progress.total_count = data.get('total_count', progress.total_count)
+            self._consume_search_page(progress, data['items'], repos, seen_urls)
+            if progress.stop_reason:
                 break
                 
-            for item in data['items']:
+            page += 1
+
+        self._finish_query(progress)
+        return repos[:max_repos]
+
+    def _consume_search_page(self, progress: QueryProgress, items: List[Dict],
+                             repos: List[RepoInfo], seen_urls: set):
+        """Filter one page of REST-shaped search items and record whether to keep paginating"""
+        progress.pages_fetched += 1
+        accepted_before = len(repos)
+        with self.metrics.span('filter'):
+            for item in items:
                 repo_info = RepoInfo.from_github_api(item)
                 if repo_info.html_url in seen_urls:
                     continue
                 if self._should_include_repo(repo_info):
                     seen_urls.add(repo_info.html_url)
                     repos.append(repo_info)
+        progress.items_seen += len(items)
+        progress.lowest_stars = items[-1].get('stargazers_count', 0)
+        progress.accepted = len(repos)
+        progress.page_yields.append((len(repos) - accepted_before) / len(items))
+        if self.rank_threshold is not None and progress.feeds_threshold:
+            self.rank_threshold.add(repos[accepted_before:progress.max_repos])
+        progress.stop_reason = self._pagination_stop_reason(progress, items)
 
-            if len(data['items']) < params['per_page']:
-                break
-            
-            if len(repos) >= self.config['max_repos_per_query']:
-                break
-                
+    def _finish_query(self, progress: QueryProgress):
+        progress.stop_reason = progress.stop_reason or 'max_pages'
+        self.query_progress[progress.query] = progress
+        self.metrics.query(
+            progress.query, pages_fetched=progress.pages_fetched, items_seen=progress.items_seen,
+            accepted=progress.accepted, total_count=progress.total_count, stop_reason=progress.stop_reason
+        )
+        logger.info(
+            f"Query done: {progress.pages_fetched} pages, {progress.accepted}/{progress.items_seen} accepted, "
+            f"{progress.pages_saved} pages saved ({progress.stop_reason}): {progress.query}"
+        )
+
+    @staticmethod
+    def _graphql_node_to_rest(node: Dict) -> Dict:
+        """Reshape a GraphQL Repository node into the REST search item fields RepoInfo reads"""
+        return {
+            'name': node.get('name', 'N/A'),
+            'full_name': node.get('nameWithOwner', 'N/A'),
+            'html_url': node.get('url', '#'),
+            'description': node.get('description'),
+            'stargazers_count': node.get('stargazerCount', 0),
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            'updated_at': node.get('updatedAt') or '',
+            # REST lists topics alphabetically
+            'topics': sorted(topic['topic']['name'] for topic in node['repositoryTopics']['nodes']),
+            'license': node.get('licenseInfo'),
+            'fork': node.get('isFork', False),
+            'size': node.get('diskUsage') or 0,
+            'pushed_at': node.get('pushedAt') or '',
+        }
+
+    def _build_graphql_search(self, aliases: List[str], per_page: int) -> str:
+        """One GraphQL document searching every alias's query in a single round trip"""
+        variables = ', '.join(f"$q_{alias}: String!, $after_{alias}: String" for alias in aliases)
+        searches = '\n'.join(
+            f"  {alias}: search(query: $q_{alias}, type: REPOSITORY, first: {per_page}, after: $after_{alias}) {{\n"
+            f"    repositoryCount\n    pageInfo {{ hasNextPage endCursor }}\n"
+            f"    nodes {{ ... on Repository {{{GRAPHQL_REPO_FIELDS}}} }}\n  }}"
+            for alias in aliases
+        )
+        return f"query({variables}) {{\n{searches}\n}}"
+
+    def search_repositories_graphql(self, queries: List[str], quotas: Optional[List[int]] = None,
+                                    feeds_threshold: Optional[List[bool]] = None) -> List[List[RepoInfo]]:
+        """Search several queries through GraphQL, batching their pages into one request via aliases"""
+        advanced = self.config.get('advanced_options', {})
+        per_page = 100
+        max_pages = min(int(advanced.get('max_pages', 5)), 1000 // per_page)
+        quotas = quotas or [self.config['max_repos_per_query']] * len(queries)
+        feeds_threshold = feeds_threshold or [True] * len(queries)
+        states = {}
+        for i, query in enumerate(queries):
+            effective_query = self._build_search_query(query)
+            states[f"q{i}"] = {
+                'search': f"{effective_query} sort:stars-desc",
+                'progress': QueryProgress(effective_query, max_pages, per_page, quotas[i], feeds_threshold[i]),
+                'repos': [],
+                'seen_urls': set(),
+                'cursor': None,
+            }
+
+        page = 1
+        active = list(states)
+        while active and page <= max_pages:
+            logger.info(f"GraphQL search: page {page} for {len(active)} queries")
+            variables = {}
+            for alias in active:
+                variables[f"q_{alias}"] = states[alias]['search']
+                variables[f"after_{alias}"] = states[alias]['cursor']
+            data = self._make_graphql_request(self._build_graphql_search(active, per_page), variables)
+
+            still_active = []
+            for alias in active:
+                state = states[alias]
+                progress = state['progress']
+                result = (data or {}).get(alias)
+                if result is None:
+                    progress.stop_reason = 'failed'
+                    continue
+                items = [self._graphql_node_to_rest(node) for node in (result or {}).get('nodes', []) if node]
+                if not items:
+                    progress.stop_reason = 'empty'
+                    continue
+                progress.total_count = result.get('repositoryCount', progress.total_count)
+                self._consume_search_page(progress, items, state['repos'], state['seen_urls'])
+                if not progress.stop_reason and not result['pageInfo']['hasNextPage']:
+                    progress.stop_reason = 'exhausted'
+                if not progress.stop_reason:
+                    state['cursor'] = result['pageInfo']['endCursor']
+                    still_active.append(alias)
+
+            active = still_active
             page += 1
-            time.sleep(api_delay)
-            
-        return repos[:self.config['max_repos_per_query']]
 
-    def _is_recent_enough(self, last_updated: str) -> bool:
-        """Check if repository was updated within configured recency window."""
-        max_age_days = int(self.config.get('advanced_options', {}).get('min_last_update_days', 365))
-        if not last_updated:
-            return False
+        for state in states.values():
+            self._finish_query(state['progress'])
+        return [states[f"q{i}"]['repos'][:quotas[i]] for i in range(len(queries))]
+
+    def _core_rate_limit_remaining(self) -> Optional[int]:
+        """Remaining core API quota; querying /rate_limit does not count against it"""
+        import requests
+
         try:
-            updated_dt = datetime.strptime(last_updated, "%Y-%m-%d")
-        except ValueError:
-            return False
-        age_days = (datetime.utcnow() - updated_dt).days
-        return age_days <= max_age_days
-
-    def _preference_score(self, repo: RepoInfo) -> int:
-        """Compute score boost for preferred topics from configuration."""
-        preferred_topics = self.config.get('advanced_options', {}).get('prefer_topics', [])
-        if not preferred_topics:
-            return 0
-        repo_topics = {topic.lower() for topic in repo.topics}
-        return sum(1 for topic in preferred_topics if topic.lower() in repo_topics)
-    
-    def _should_include_repo(self, repo: RepoInfo) -> bool:
-        """Additional filtering logic for repositories, now handles None descriptions."""
-        filters = self.config.get('filters', {})
-        advanced = self.config.get('advanced_options', {})
+            response = self.session.get(f"{self.api_url}/rate_limit", timeout=30)
+            if response.status_code == 200:
+                return int(response.json()['resources']['core']['remaining'])
+            logger.warning(f"Rate limit check returned: {response.status_code}")
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            logger.warning(f"Rate limit check failed: {e}")
+        return None
 
-        min_stars = int(filters.get('min_stars', 0))
-        if repo.stars < min_stars:
-            return False
+    def _fetch_repo_details(self, repo: RepoInfo) -> Dict:
+        """Enrichment details for one repository, paced by the core rate limiter"""
+        def request(url: str, params: Dict = None) -> Optional[Dict]:
+            return self._make_api_request(url, params, limiter=self.core_rate_limiter, allow_missing=True)
 
-        min_size_kb = int(filters.get('min_size', 0))
-        if repo.size_kb < min_size_kb:
-            return False
+        return fetch_details(request, self.api_url, repo.full_name, repo.pushed_at)
 
-        languages = filters.get('languages', [])
-        if languages and repo.language not in languages:
-            return False
+    def enrich_repositories(self, repos: List[RepoInfo], store: RepoStore):
+        """Fetch README, release, contributor and commit details for repositories pushed since last time
 
-        if not advanced.get('include_forks', False) and repo.is_fork:
-            return False
+        Repositories are taken in rank order until the run's request budget,
+        capped by the core quota left above reserve_requests, is spent; the
+        rest keep their stored details and are picked up by a later run.
+        """
+        settings = self.enrichment
+        stored = store.details(repo.full_name for repo in repos)
+        max_age = float(settings['max_age_days']) * 86400
+        now = time.time()
+        due = [repo for repo in repos if is_stale(stored.get(repo.full_name), repo.pushed_at, max_age, now)]
+        if not due:
+            logger.info(f"Enrichment: all {len(repos)} repositories unchanged since their last push")
+            return
 
-        if advanced.get('require_license', False) and not repo.license_name:
-            return False
+        budget = int(settings['max_requests'])
+        remaining = self._core_rate_limit_remaining()
+        if remaining is not None:
+            budget = min(budget, remaining - int(settings['reserve_requests']))
+        deferred = due[max(0, budget // REQUESTS_PER_REPO):]
+        due = due[:len(due) - len(deferred)]
 
-        if not self._is_recent_enough(repo.last_updated):
-            return False
+        with ThreadPoolExecutor(max_workers=max(1, int(settings['max_workers']))) as executor:
+            details = list(executor.map(self._fetch_repo_details, due))
+        store.upsert_details(details)
 
-        exclude_keywords = filters.get('exclude_keywords', [])
-        searchable_text = f"{repo.name} {repo.description or ''}".lower()
-        if any(keyword.lower() in searchable_text for keyword in exclude_keywords):
-            return False
+        incomplete = sum(1 for record in details if record['pushed_at'] is None)
+        self.metrics.incr('enriched', len(details) - incomplete)
+        self.metrics.incr('enrichment_incomplete', incomplete)
+        self.metrics.incr('enrichment_deferred', len(deferred))
+        logger.info(
+            f"Enrichment: {len(details) - incomplete} refreshed, {incomplete} incomplete, "
+            f"{len(repos) - len(due) - len(deferred)} unchanged, {len(deferred)} deferred by the request budget"
+        )
 
-        generic_names = ['awesome', 'list', 'collection', 'resources']
-        if any(name in repo.name.lower() for name in generic_names):
-            return repo.stars > 1000
-        
-        # Check for description existence before checking its length
-        if not repo.description or len(repo.description) < 20:
-            return repo.stars > 100
-        
-        return True
+    def _rank_key(self, repo: RepoInfo) -> Tuple:
+        """Sort key for one repository, highest first; query hits are only known after the merge"""
+        return (self.scorer.score_one(repo, velocity=self.star_velocity.get(repo.full_name, 0.0)), repo.stars)
+
+    def _rank_upper_bound(self, stars: int) -> Tuple:
+        """Best rank key any repository with at most this many stars could reach"""
+        return (self.scorer.upper_bound(stars), stars)
+
+    def _rank(self, repos: List[RepoInfo], query_hits: Counter) -> List[RepoInfo]:
+        """Order repositories by relevance score, then stars, scoring the collection in one pass"""
+        scores = self.scorer.score(
+            repos,
+            [query_hits[repo.html_url] for repo in repos],
+            [self.star_velocity.get(repo.full_name, 0.0) for repo in repos]
+        )
+        order = sorted(range(len(repos)), key=lambda i: (scores[i], repos[i].stars), reverse=True)
+        return [repos[i] for i in order]
+    
+    def _sleep(self, seconds: float):
+        """Retry backoff delay, timed so the run report shows idle time"""
+        with self.metrics.span('sleep'):
+            time.sleep(seconds)
+
+    def _should_include_repo(self, repo: RepoInfo) -> bool:
+        """Additional filtering logic for repositories, delegated to the compiled filter."""
+        return self.repo_filter(repo)
 
     def analyze_repositories(self, repos: List[RepoInfo]) -> Dict:
-        """Analyze repository collection for insights"""
-        if not repos:
-            return {}
-        
-        analysis = {
-            'total_repos': len(repos),
-            'total_stars': sum(r.stars for r in repos),
-            'languages': {},
-            'topics': {},
-            'licenses': {},
-            'recent_repos': sorted(repos, key=lambda r: r.last_updated, reverse=True)[:10],
-            'top_starred': sorted(repos, key=lambda r: r.stars, reverse=True)[:20]
-        }
-        
+        """Analyze repository collection for insights in a single streaming pass"""
+        analytics = RepoAnalytics()
         for repo in repos:
-            analysis['languages'][repo.language] = analysis['languages'].get(repo.language, 0) + 1
-            for topic in repo.topics:
-                analysis['topics'][topic] = analysis['topics'].get(topic, 0) + 1
-            if repo.license_name:
-                analysis['licenses'][repo.license_name] = analysis['licenses'].get(repo.license_name, 0) + 1
-                
-        return analysis
+            analytics.add(repo)
+        return analytics.result()
 
     def format_output(self, all_repos: List[RepoInfo], analysis: Dict) -> str:
         """Format repository data for output"""
@@ -330,11 +1254,11 @@ class GitHubCurator:
         content += f"- **Total Stars**: {analysis.get('total_stars', 0):,}\n\n"
         
         content += "### 🔥 Top Languages\n"
-        for lang, count in sorted(analysis.get('languages', {}).items(), key=lambda x: x[1], reverse=True)[:5]:
+        for lang, count in Counter(analysis.get('languages', {})).most_common(5):
             content += f"- **{lang}**: {count} repositories\n"
             
         content += "\n### 🏷️ Popular Topics\n"
-        for topic, count in sorted(analysis.get('topics', {}).items(), key=lambda x: x[1], reverse=True)[:10]:
+        for topic, count in Counter(analysis.get('topics', {})).most_common(10):
             content += f"- `{topic}` ({count})\n"
             
         content += "\n## ⭐ Top Starred Repositories\n\n"
@@ -348,78 +1272,385 @@ class GitHubCurator:
             
         return content
 
-    def save_cache(self, data: List[RepoInfo], filename: str = 'cache.json'):
-        """Save repository data to cache"""
+    def save_cache(self, data: List[RepoInfo], query_cache: Dict[str, Dict], filename: str = 'cache.json'):
+        """Save merged repository rows plus per-query row references to cache"""
         if not self.config.get('enable_caching'):
             return
-            
-        with open(filename, 'w') as f:
-            json.dump({'timestamp': time.time(), 'repositories': [asdict(repo) for repo in data]}, f, indent=2)
+
+        row_index = {repo.html_url: i for i, repo in enumerate(data)}
+        queries = {
+            query: {'timestamp': entry['timestamp'], 'rows': [row_index[repo.html_url] for repo in entry['repositories']]}
+            for query, entry in query_cache.items()
+        }
+        _dump_json({
+            'format': CACHE_FORMAT,
+            'timestamp': time.time(),
+            'fields': list(REPO_FIELDS),
+            'query_stats': self.query_stats,
+            # Queries go before rows so a streaming load knows which rows it needs
+            'queries': queries,
+            'rows': [repo.to_row() for repo in data]
+        }, filename)
         
-        logger.info(f"Saved {len(data)} repositories to cache")
+        logger.info(f"Saved {len(data)} repositories for {len(queries)} queries to cache")
     
-    def load_cache(self, filename: str = 'cache.json') -> Optional[List[RepoInfo]]:
-        """Load repository data from cache if valid"""
+    @staticmethod
+    def _read_cache(reader: JSONStreamReader, max_age: float, now: float) -> Tuple[Optional[Dict], Dict, Dict[int, RepoInfo]]:
+        """Stream the cache document, building RepoInfo only for rows that fresh queries reference
+
+        Returns (header, queries, repos by row index); header is None when the
+        format or fields do not match this version. Caches written before the
+        queries moved ahead of the rows still load, building every row.
+        """
+        header, queries, repos = {}, None, {}
+        for key in reader.iter_object_keys():
+            if key == 'rows':
+                if header.get('format') != CACHE_FORMAT or header.get('fields') != list(REPO_FIELDS):
+                    return None, {}, {}
+                needed = None if queries is None else {
+                    i for entry in queries.values() if now - entry['timestamp'] <= max_age for i in entry['rows']
+                }
+                for i, row in enumerate(reader.iter_array()):
+                    if needed is None or i in needed:
+                        repos[i] = RepoInfo.from_row(row)
+            elif key == 'queries':
+                queries = reader.decode_value()
+            else:
+                header[key] = reader.decode_value()
+        if header.get('format') != CACHE_FORMAT or header.get('fields') != list(REPO_FIELDS):
+            return None, {}, {}
+        return header, queries or {}, repos
+
+    def load_cache(self, filename: str = 'cache.json') -> Dict[str, Dict]:
+        """Load fresh per-query results from cache, keyed by effective search query"""
         if not self.config.get('enable_caching') or not Path(filename).exists():
-            return None
+            return {}
         
+        max_age = self.config.get('cache_duration_hours', 24) * 3600
+        now = time.time()
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-            
-            if time.time() - data['timestamp'] > self.config.get('cache_duration_hours', 24) * 3600:
-                logger.info("Cache expired")
-                return None
-            
-            repos = [RepoInfo(**repo_data) for repo_data in data['repositories']]
-            logger.info(f"Loaded {len(repos)} repositories from cache")
-            return repos
+            with open(filename, 'r', encoding='utf-8') as f:
+                header, queries, repos = self._read_cache(JSONStreamReader(f), max_age, now)
+
+            if header is None:
+                logger.info("Cache format changed, refetching all queries")
+                return {}
+
+            # Kept for stale queries too: the planner needs them most
+            self.query_stats = header.get('query_stats') or {}
+            fresh = {query: entry for query, entry in queries.items() if now - entry['timestamp'] <= max_age}
+            query_cache = {
+                query: {'timestamp': entry['timestamp'], 'repositories': [repos[i] for i in entry['rows']]}
+                for query, entry in fresh.items()
+            }
+
+            logger.info(f"Loaded {len(query_cache)}/{len(queries)} fresh queries from cache")
+            return query_cache
             
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
-            return None
+            return {}
+
+    def _fetch_queries(self, queries: List[str], quotas: Optional[List[int]] = None,
+                       feeds_threshold: Optional[List[bool]] = None) -> List[List[RepoInfo]]:
+        """Run searches for the given queries, serially or across workers; quotas override max_repos_per_query"""
+        advanced = self.config.get('advanced_options', {})
+        quotas = quotas or [self.config['max_repos_per_query']] * len(queries)
+        feeds_threshold = feeds_threshold or [True] * len(queries)
+        if advanced.get('search_backend', 'rest') == 'graphql':
+            batch_size = max(1, int(advanced.get('graphql_batch_size', 5)))
+            batches = [(queries[i:i + batch_size], quotas[i:i + batch_size], feeds_threshold[i:i + batch_size])
+                       for i in range(0, len(queries), batch_size)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return [repos for batch in executor.map(lambda batch: self.search_repositories_graphql(*batch), batches)
+                        for repos in batch]
+
+        if self.max_workers > 1:
+            # Queries fan out across workers; the shared rate limiter replaces the fixed delays
+            logger.info(f"Running {len(queries)} queries with {self.max_workers} workers")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(self.search_repositories, queries, quotas, feeds_threshold))
+
+        # The rate limiter paces requests, so no fixed delay between queries
+        return [self.search_repositories(*search) for search in zip(queries, quotas, feeds_threshold)]
     
-    def run(self):
-        """Main execution method"""
-        logger.info("Starting AI Repository Curator")
-        
-        all_repos = self.load_cache()
-        
-        if not all_repos:
-            all_repos = []
-            queries = self.config.get('search_queries', [])
-            api_delay = float(self.config.get('advanced_options', {}).get('api_delay_seconds', 1.0))
-            seen_urls = set()
-            for query in queries:
-                for repo in self.search_repositories(query):
-                    if repo.html_url in seen_urls:
-                        continue
-                    seen_urls.add(repo.html_url)
-                    all_repos.append(repo)
-                time.sleep(api_delay)
-
-            all_repos.sort(
-                key=lambda repo: (self._preference_score(repo), repo.stars),
-                reverse=True
-            )
-            
-            logger.info(f"Found {len(all_repos)} unique repositories")
-            self.save_cache(all_repos)
+    def start_cycle(self):
+        """Reset the per-run filter statistics, query progress, metrics and scorer"""
+        self.repo_filter = RepoFilter(self.config)
+        self.query_progress = {}
+        self.metrics = RunMetrics('curator')
+        self.scorer = RelevanceScorer(self.config, self.rank_by)
+
+    def effective_queries(self) -> Dict[str, str]:
+        """Configured search queries mapped to the GitHub queries actually sent, which key the cache"""
+        return {query: self._build_search_query(query) for query in self.config.get('search_queries', [])}
+
+    def refresh_queries(self, query_cache: Dict[str, Dict], stale_queries: List[str],
+                        effective_queries: Dict[str, str]) -> set:
+        """Fetch stale queries into query_cache, returning the effective queries that failed part-way"""
+        max_total = int(self.config.get('max_total_repos', 0))
+        failed_queries = set()
+        logger.info(f"Refreshing {len(stale_queries)}/{len(effective_queries)} queries")
+        # Collapsing near-duplicates after the fetch can free top-N slots the threshold already counted
+        # as taken, so the below_top_n stop is only sound when that collapse is off
+        near_duplicates = self.config.get('advanced_options', {}).get('near_duplicates', {})
+        if max_total > 0 and not near_duplicates.get('enabled'):
+            # Fresh cached results already claim ranking slots that new pages must beat
+            self.rank_threshold = RankThreshold(max_total, self._rank_key)
+            for query, effective_query in effective_queries.items():
+                if query not in stale_queries and effective_query in query_cache:
+                    self.rank_threshold.add(query_cache[effective_query]['repositories'])
+        fetched_at = time.time()
+        plan = self.plan_searches(stale_queries)
+        max_repos = self.config['max_repos_per_query']
+        with self.metrics.span('fetch'):
+            search_results = self._fetch_queries([planned.search for planned in plan],
+                                                 [max_repos * len(planned.members) for planned in plan],
+                                                 [planned.kind == 'single' for planned in plan])
+
+        member_results: Dict[str, List[RepoInfo]] = {query: [] for query in stale_queries}
+        member_searches: Dict[str, List[Tuple]] = {query: [] for query in stale_queries}
+        # Efficiency counts repositories no fresh query or earlier search of this run already returned
+        seen_urls = {
+            repo.html_url for query, effective_query in effective_queries.items()
+            if query not in stale_queries and effective_query in query_cache
+            for repo in query_cache[effective_query]['repositories']
+        }
+        new_unique = requests = 0
+        for planned, repos in zip(plan, search_results):
+            progress = self.query_progress.get(self._build_search_query(planned.search))
+            attributed = attribute(repos, planned.members) if planned.kind == 'merged' else {planned.members[0]: repos}
+            for member, member_repos in attributed.items():
+                member_results[member].extend(member_repos)
+                # A merged search's total_count is split by how much of its results each member matched
+                share = len(member_repos) / len(repos) if repos else 1 / len(planned.members)
+                member_searches[member].append((planned, progress, share, len(member_repos)))
+            new_repos = [repo for repo in repos if repo.html_url not in seen_urls]
+            seen_urls.update(repo.html_url for repo in new_repos)
+            new_unique += len(new_repos)
+            if progress is not None:
+                requests += progress.requests
+                self.metrics.query(progress.query, kind=planned.kind, members=len(planned.members),
+                                   new_unique=len(new_repos))
+
+        for query in stale_queries:
+            # Split ranges arrive one after another, so the quota must cut the union by stars, as one search would
+            unique_repos = sorted({repo.html_url: repo for repo in member_results[query]}.values(),
+                                  key=lambda repo: repo.stars, reverse=True)[:max_repos]
+            query_cache[effective_queries[query]] = {'timestamp': fetched_at, 'repositories': unique_repos}
+            if self.rank_threshold is not None and any(planned.kind != 'single' for planned, *_ in member_searches[query]):
+                self.rank_threshold.add(unique_repos)
+            searches = member_searches[query]
+            if any(progress is None or progress.stop_reason == 'failed' for _, progress, _, _ in searches):
+                failed_queries.add(effective_queries[query])
+            else:
+                self.query_stats[query] = self._query_stats(query, searches, unique_repos, fetched_at)
+        # Stats of queries no longer configured would only mislead the planner
+        self.query_stats = {query: stats for query, stats in self.query_stats.items() if query in effective_queries}
+
+        per_request = new_unique / requests if requests else 0.0
+        self.metrics.gauge('search_requests', requests)
+        self.metrics.gauge('new_unique_repos', new_unique)
+        self.metrics.gauge('unique_repos_per_request', round(per_request, 3))
+        logger.info(f"Search efficiency: {new_unique} new unique repositories from {requests} requests "
+                    f"({per_request:.1f} per request)")
+        if failed_queries:
+            self.metrics.incr('queries_failed', len(failed_queries))
+            logger.warning(f"{len(failed_queries)} queries failed part-way; their partial results will not be cached")
+        self.rank_threshold = None
+        logger.info(self.repo_filter.summary())
+        self.metrics.incr('items_checked', self.repo_filter.checked)
+        self.metrics.incr('items_accepted', self.repo_filter.accepted)
+        for stage, count in self.repo_filter.rejections.items():
+            self.metrics.incr(f"rejected_{stage}", count)
+        pages_saved = sum(progress.pages_saved for progress in self.query_progress.values())
+        pages_fetched = sum(progress.pages_fetched for progress in self.query_progress.values())
+        logger.info(f"Adaptive pagination fetched {pages_fetched} pages and saved {pages_saved}")
+        return failed_queries
+
+    def plan_searches(self, queries: List[str]) -> List[PlannedSearch]:
+        """Merge small overlapping single-keyword queries and split saturated ones, when the planner is enabled
+
+        Queries of several words or with qualifiers are never merged, only split.
+        """
+        if not self.query_planner['enabled']:
+            return [PlannedSearch(query, [query]) for query in queries]
+        unmergeable = sum(1 for query in queries if not is_mergeable(query))
+        if unmergeable:
+            logger.info(f"Query planner merges only single-keyword queries; {unmergeable}/{len(queries)} "
+                        f"queries have several words or qualifiers and are never merged")
+        # A merged search only pays off if its combined results fit in the pages it may fetch
+        advanced = self.config.get('advanced_options', {})
+        settings = dict(self.query_planner, merge_max_results=min(
+            int(self.query_planner['merge_max_results']), int(advanced.get('max_pages', 5)) * 100))
+        plan = plan_searches(
+            queries, self.query_stats, settings,
+            int(self.config.get('filters', {}).get('min_stars', 0)), self._pushed_after(),
+            max_repos=int(self.config['max_repos_per_query']),
+            fits=lambda search: len(self._build_search_query(search)) <= MAX_QUERY_LENGTH
+        )
+        merged = [planned for planned in plan if planned.kind == 'merged']
+        split = {planned.members[0] for planned in plan if planned.kind == 'split'}
+        for planned in merged:
+            logger.info(f"Merged {len(planned.members)} queries into one search: {planned.search}")
+        for query in split:
+            logger.info(f"Split saturated query into ranges: {query}")
+        logger.info(f"Query plan: {len(plan)} searches for {len(queries)} queries "
+                    f"({len(merged)} merged, {len(split)} split)")
+        return plan
+
+    def _query_stats(self, query: str, searches: List[Tuple], repos: List[RepoInfo], fetched_at: float) -> Dict:
+        """What this run saw for one configured query, across the searches that served it"""
+        first, last = searches[0][1], searches[-1][1]
+        stats = {
+            'total_count': round(sum((progress.total_count or 0) * share for _, progress, share, _ in searches)),
+            'requests': round(sum(progress.requests / len(planned.members) for planned, progress, _, _ in searches), 2),
+            'stop_reason': last.stop_reason,
+            'lowest_stars': first.lowest_stars,
+            # What one search window yielded; a split is only worth it while this falls short of the quota
+            'window_results': searches[0][3],
+            'repos': [repo.full_name for repo in repos],
+            'fetched_at': fetched_at,
+        }
+        if searches[0][0].kind == 'split':
+            # The top range narrows to what it fetched only when it filled its pages again
+            previous = self.query_stats.get(query, {})
+            pivot = first.lowest_stars if first.stop_reason == 'max_pages' else previous.get('split_pivot')
+            stats['split_pivot'] = pivot or previous.get('lowest_stars')
+        return stats
+
+    def build_collection(self, query_cache: Dict[str, Dict], effective_queries: Dict[str, str]) -> List[RepoInfo]:
+        """Merge the per-query results, log star snapshots and rank the unique repositories"""
+        all_repos = []
+        seen_urls = set()
+        query_hits = Counter()
+        for effective_query in effective_queries.values():
+            for repo in query_cache[effective_query]['repositories']:
+                query_hits[repo.html_url] += 1
+                if repo.html_url in seen_urls:
+                    continue
+                seen_urls.add(repo.html_url)
+                all_repos.append(repo)
+
+        if self.config.get('store_path'):
+            with self.metrics.span('snapshots'), RepoStore(self.config['store_path']) as store:
+                # Each cache entry is logged under the day it was fetched, not the day it was served
+                for effective_query in effective_queries.values():
+                    entry = query_cache[effective_query]
+                    store.record_snapshots(((repo.full_name, repo.stars) for repo in entry['repositories']),
+                                           utc_day(entry['timestamp']))
+                if self.rank_by == 'velocity':
+                    window_days = int(self.config.get('advanced_options', {}).get('velocity_window_days', 30))
+                    self.star_velocity = store.star_velocity(window_days, [repo.full_name for repo in all_repos])
+
+        with self.metrics.span('rank'):
+            all_repos = self._rank(all_repos, query_hits)
+        logger.info(f"Found {len(all_repos)} unique repositories")
+        return all_repos
+
+    def publish(self, all_repos: List[RepoInfo]) -> Tuple[List[RepoInfo], str]:
+        """Collapse, truncate and store the ranked list and write README.md; returns the list and its markdown"""
+        max_total = int(self.config.get('max_total_repos', 0))
+        near_duplicates = self.config.get('advanced_options', {}).get('near_duplicates', {})
+        if near_duplicates.get('enabled'):
+            with self.metrics.span('near_duplicates'):
+                token_sets = [repo_tokens(repo.name, repo.description, repo.topics) for repo in all_repos]
+                all_repos, clusters = collapse(all_repos, token_sets, **near_duplicates)
+            for cluster in clusters:
+                logger.info(f"Near-duplicates of {cluster[0].full_name}: {', '.join(repo.full_name for repo in cluster[1:])}")
+            self.metrics.incr('near_duplicates_dropped', sum(len(cluster) - 1 for cluster in clusters))
+
+        # The cache keeps every result so per-query entries stay complete
+        if max_total > 0:
+            all_repos = all_repos[:max_total]
+
+        if self.config.get('store_path'):
+            with self.metrics.span('store_upsert'), RepoStore(self.config['store_path']) as store:
+                changed = store.upsert(repo.to_dict() for repo in all_repos)
+                # The website lists only this publish (plus the legacy list), so dropped repositories leave it
+                store.mark_seen(repo.full_name for repo in all_repos)
+            logger.info(f"Upserted {changed} changed repositories into {self.config['store_path']}")
+            if self.enrichment['enabled']:
+                with self.metrics.span('enrich'), RepoStore(self.config['store_path']) as store:
+                    self.enrich_repositories(all_repos, store)
+        elif self.enrichment['enabled']:
+            logger.warning("Enrichment is enabled but store_path is not set; skipping it")
         
-        analysis = self.analyze_repositories(all_repos)
-        formatted_content = self.format_output(all_repos, analysis)
+        with self.metrics.span('analyze'):
+            analysis = self.analyze_repositories(all_repos)
+        with self.metrics.span('format'):
+            formatted_content = self.format_output(all_repos, analysis)
         
         # Write to README.md locally for the action to pick up
-        with open("README.md", "w", encoding="utf-8") as f:
+        with self.metrics.span('write_readme'), open("README.md", "w", encoding="utf-8") as f:
             f.write(formatted_content)
-            
+        self.metrics.gauge('unique_repos', len(all_repos))
+        return all_repos, formatted_content
+
+    def save_response_cache(self):
+        """Write the HTTP cache after publishing, which also adds the enrichment responses"""
+        if self.response_cache is not None:
+            with self.metrics.span('http_cache_save'):
+                self.response_cache.save()
+
+    def finish_cycle(self):
+        """Log the run's metrics summary and append its report to the metrics file"""
+        self.metrics.gauge('circuit_breaker_trips', self.circuit_breaker.trips)
+        if self.response_cache is not None:
+            self.metrics.gauge('http_cache_hits', self.response_cache.hits)
+        logger.info(self.metrics.summary())
+        self.metrics.write(self.config.get('advanced_options', {}).get('metrics_file', 'run_metrics.jsonl'))
+
+    def run(self):
+        """Main execution method"""
+        logger.info("Starting AI Repository Curator")
+        self.start_cycle()
+        effective_queries = self.effective_queries()
+        with self.metrics.span('cache_load'):
+            query_cache = self.load_cache()
+        stale_queries = [query for query, effective_query in effective_queries.items() if effective_query not in query_cache]
+        failed_queries = set()
+
+        if stale_queries:
+            failed_queries = self.refresh_queries(query_cache, stale_queries, effective_queries)
+        else:
+            logger.info("All queries served from cache")
+
+        # Drop entries for queries that are no longer configured
+        query_cache = {effective_query: query_cache[effective_query] for effective_query in effective_queries.values()}
+        all_repos = self.build_collection(query_cache, effective_queries)
+
+        if stale_queries:
+            with self.metrics.span('cache_save'):
+                # Failed queries stay stale so the next run retries just those
+                self.save_cache(all_repos, {key: entry for key, entry in query_cache.items() if key not in failed_queries})
+
+        self.publish(all_repos)
+        self.save_response_cache()
+        self.finish_cycle()
         logger.info("Curator run completed successfully")
 
-def main():
-    """Main function"""
+def main(argv: Optional[List[str]] = None):
+    """Main function: one run by default, or a long-running service with --serve"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Curate GitHub repositories into README.md and the website store")
+    parser.add_argument('--config', default='config.json', help='configuration file')
+    parser.add_argument('--serve', action='store_true',
+                        help='keep running, refresh queries on their schedules and serve the list over HTTP')
+    parser.add_argument('--host', help='address to serve on (default: advanced_options.daemon.host)')
+    parser.add_argument('--port', type=int, help='port to serve on (default: advanced_options.daemon.port)')
+    args = parser.parse_args(argv)
+
+    configure_logging()
     try:
-        curator = GitHubCurator()
-        curator.run()
+        curator = GitHubCurator(args.config)
+        if args.serve:
+            from curator_daemon import CuratorDaemon
+            daemon = CuratorDaemon(curator, curator.config.get('advanced_options', {}).get('daemon'))
+            daemon.serve_forever(args.host, args.port)
+        else:
+            curator.run()
     except Exception as e:
         logger.error(f"Curator failed: {e}", exc_info=True)
         raise
@@ -0,0 +1,100 @@
+"""Per-repository details for the website cards beyond the search payload.
+
+fetch_details makes four REST calls for one repository (README, latest
+release, contributors, last commit) through a request function supplied by
+the curator, which handles rate limiting, retries and ETag revalidation.
+Details are keyed on the repository's pushed_at, so a repository nobody has
+pushed to since the last run is not fetched again until max_age expires.
+"""
+import base64
+import re
+import time
+from typing import Callable, Dict, Optional
+
+REQUESTS_PER_REPO = 4
+# One page of contributors; a full page is shown as "100+"
+CONTRIBUTORS_PAGE = 100
+EXCERPT_LENGTH = 280
+
+DETAIL_FIELDS = ('readme_excerpt', 'latest_release', 'release_published_at', 'contributors', 'last_commit')
+
+DEFAULT_SETTINGS = {
+    'enabled': False,
+    'max_workers': 4,
+    'requests_per_minute': 600,
+    'max_requests': 400,
+    'reserve_requests': 500,
+    'max_age_days': 7,
+}
+
+# Markdown and HTML that never reads well in a one-paragraph excerpt
+FENCE_RE = re.compile(r'^(```|~~~).*?^\1', re.MULTILINE | re.DOTALL)
+HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+INLINE_MARKUP_RE = re.compile(r'[*_`]+')
+SKIPPED_LINE_RE = re.compile(r'^\s*(#|[-=]{3,}\s*$|\||>|\[!\[|!\[)')
+
+
+def readme_excerpt(markdown: str, limit: int = EXCERPT_LENGTH) -> Optional[str]:
+    """First prose paragraph of a README, without headings, badges or markup"""
+    text = HTML_COMMENT_RE.sub('', FENCE_RE.sub('', markdown))
+    for paragraph in re.split(r'\n\s*\n', text):
+        lines = [line for line in paragraph.strip().splitlines() if not SKIPPED_LINE_RE.match(line)]
+        prose = INLINE_MARKUP_RE.sub('', LINK_RE.sub(r'\1', IMAGE_RE.sub('', HTML_TAG_RE.sub(' ', ' '.join(lines)))))
+        prose = ' '.join(prose.split())
+        # Badge rows and stray link lists leave a few words at most
+        if len(prose.split()) < 5:
+            continue
+        if len(prose) <= limit:
+            return prose
+        return prose[:limit].rsplit(' ', 1)[0].rstrip(',;:') + '…'
+    return None
+
+
+def is_stale(details: Optional[Dict], pushed_at: str, max_age_seconds: float, now: Optional[float] = None) -> bool:
+    """True when stored details are missing, predate the last push or are too old"""
+    if details is None or not pushed_at or details.get('pushed_at') != pushed_at:
+        return True
+    return (time.time() if now is None else now) - details['fetched_at'] > max_age_seconds
+
+
+def fetch_details(request: Callable[..., Optional[Dict]], api_url: str, full_name: str, pushed_at: str) -> Dict:
+    """Fetch and summarize one repository's details
+
+    request(url, params) returns the decoded body, {} for a 404 (no README or
+    no release) or None when the call failed. Failed fields stay None and the
+    record is stored without pushed_at, so the next run fetches it again.
+    """
+    base = f"{api_url}/repos/{full_name}"
+    details = dict.fromkeys(DETAIL_FIELDS)
+    complete = True
+
+    readme = request(f"{base}/readme")
+    if readme is None:
+        complete = False
+    elif readme.get('content') and readme.get('encoding') == 'base64':
+        details['readme_excerpt'] = readme_excerpt(base64.b64decode(readme['content']).decode('utf-8', 'replace'))
+
+    release = request(f"{base}/releases/latest")
+    if release is None:
+        complete = False
+    elif release:
+        details['latest_release'] = release.get('tag_name') or release.get('name')
+        details['release_published_at'] = (release.get('published_at') or '')[:10] or None
+
+    contributors = request(f"{base}/contributors", {'per_page': CONTRIBUTORS_PAGE})
+    if contributors is None:
+        complete = False
+    elif isinstance(contributors, list):
+        details['contributors'] = len(contributors)
+
+    commits = request(f"{base}/commits", {'per_page': 1})
+    if commits is None:
+        complete = False
+    elif isinstance(commits, list) and commits:
+        details['last_commit'] = (commits[0].get('commit', {}).get('committer', {}).get('date') or '')[:10] or None
+
+    details.update(full_name=full_name, pushed_at=pushed_at if complete else None, fetched_at=time.time())
+    return details
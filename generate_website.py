@@ -1,91 +1,33 @@
+import glob
+import hashlib
+import html
 import json
 import os
+import re
+import sqlite3
+import tempfile
 from datetime import datetime
 
+from enrichment import CONTRIBUTORS_PAGE, DETAIL_FIELDS
+from json_stream import JSONStreamReader, iter_records
+from metrics import RunMetrics
+from near_duplicates import collapse, repo_tokens
+from repo_store import RepoStore
 
-def _normalize_repo(raw_repo):
-    """Normalize repository schema from cache.json and repositories.json."""
-    topics = raw_repo.get('topics', [])
-    if not isinstance(topics, list):
-        topics = []
-
-    return {
-        'name': raw_repo.get('name', 'Unknown'),
-        'full_name': raw_repo.get('full_name', raw_repo.get('name', 'Unknown')),
-        'html_url': raw_repo.get('html_url') or raw_repo.get('url') or '#',
-        'description': raw_repo.get('description') or 'No description available.',
-        'stars': int(raw_repo.get('stars', 0) or 0),
-        'language': raw_repo.get('language') or 'N/A',
-        'last_updated': raw_repo.get('last_updated') or raw_repo.get('updated') or 'N/A',
-        'topics': topics,
-    }
-
-
-def _merge_repo_lists(cache_repos, fallback_repos):
-    """Merge repository sources with URL-based deduplication."""
-    merged = {}
-
-    for source in (cache_repos, fallback_repos):
-        for raw_repo in source:
-            repo = _normalize_repo(raw_repo)
-            key = repo['html_url'] if repo['html_url'] != '#' else repo['full_name']
-            existing = merged.get(key)
-            if existing is None:
-                merged[key] = repo
-                continue
-
-            # Prefer entry with more stars, then with more topics.
-            is_better = (
-                repo['stars'] > existing['stars']
-                or (
-                    repo['stars'] == existing['stars']
-                    and len(repo['topics']) > len(existing['topics'])
-                )
-            )
-            if is_better:
-                merged[key] = repo
-
-    return sorted(merged.values(), key=lambda repo: repo.get('stars', 0), reverse=True)
+CONFIG_PATH = 'config.json'
+STORE_PATH = 'repositories.db'
+METRICS_PATH = 'run_metrics.jsonl'
+MANIFEST_PATH = '.website-manifest.json'
+CACHE_PATH = 'cache.json'
+# Legacy repository lists, one JSON object per line or a single JSON array
+FALLBACK_PATHS = ('repositories.jsonl', 'repositories.json')
+PAGE_SIZE = 60
+DATA_DIR = 'data'
+SEARCH_TOKEN_RE = re.compile(r'[a-z0-9]+')
+DEFAULT_DESCRIPTION = 'No description available.'
 
-def generate_website():
-    """
-    Generates a clean, self-contained HTML website from repository data,
-    ensuring no external artifacts are included.
-    """
-    
-    # --- Setup and Data Loading ---
-    docs_dir = 'docs'
-    if not os.path.exists(docs_dir):
-        os.makedirs(docs_dir)
-
-    cache_file = 'cache.json'
-    cache_repos = []
-    fallback_repos = []
-
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                cache_repos = data.get('repositories', [])
-            print(f"✅ Found {len(cache_repos)} repositories in {cache_file}.")
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"⚠️ Could not read or parse {cache_file}: {e}")
-            
-    if os.path.exists('repositories.json'):
-        try:
-            with open('repositories.json', 'r', encoding='utf-8') as f:
-                fallback_repos = json.load(f)
-            print(f"✅ Found {len(fallback_repos)} repositories in repositories.json.")
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"⚠️ Could not read or parse repositories.json: {e}")
-
-    repos = _merge_repo_lists(cache_repos, fallback_repos)
-    print(f"✅ Using {len(repos)} merged repositories after normalization and deduplication.")
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-
-    # --- HTML Generation ---
-    html_content = f"""
+# Page fragments are plain format strings so each card is a single str.format call.
+PAGE_HEADER = """
     <!DOCTYPE html>
     <html lang="en" class="">
     <head>
@@ -134,54 +76,780 @@ def generate_website():
                     <svg class="h-6 w-6 hidden dark:block" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M20.354 15.354A9 9 0 018.646 3.646 9.003 9.003 0 0012 21a9.003 9.003 0 008.354-5.646z" /></svg>
                 </button>
             </header>
-            <main class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+            <form id="search-form" class="grid grid-cols-1 md:grid-cols-4 gap-4 mb-8" role="search" onsubmit="return false;">
+                <input id="search-text" type="search" placeholder="Search name, description, topics…" autocomplete="off" class="md:col-span-2 px-4 py-2 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-800 text-gray-800 dark:text-gray-100">
+                <select id="search-language" class="px-4 py-2 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-800 text-gray-800 dark:text-gray-100">
+                    <option value="">All languages</option>
+                </select>
+                <div class="grid grid-cols-2 gap-4">
+                    <input id="search-topic" type="text" list="search-topics" placeholder="Topic" autocomplete="off" class="px-4 py-2 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-800 text-gray-800 dark:text-gray-100">
+                    <input id="search-stars" type="number" min="0" placeholder="Min ⭐" class="px-4 py-2 rounded-lg border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-800 text-gray-800 dark:text-gray-100">
+                </div>
+                <datalist id="search-topics"></datalist>
+            </form>
+            <section id="search-results" class="hidden">
+                <p id="search-summary" class="text-sm text-gray-500 dark:text-gray-400 mb-4"></p>
+                <div id="search-grid" class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6"></div>
+                <div class="text-center mt-8">
+                    <button id="search-more" type="button" class="hidden px-4 py-2 rounded-lg bg-gray-200 dark:bg-gray-700 text-gray-800 dark:text-gray-200">Show more results</button>
+                </div>
+            </section>
+            <main id="repo-grid" class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
     """
 
-    if not repos:
-        html_content += """
+EMPTY_STATE = """
         <div class="col-span-full text-center py-12 bg-white dark:bg-gray-800 rounded-lg shadow-md">
             <h2 class="text-2xl font-bold text-gray-700 dark:text-gray-200">No Repositories Found</h2>
             <p class="text-gray-500 dark:text-gray-400 mt-2">The curator script did not find any repositories matching the criteria.</p>
         </div>
         """
-    else:
-        for repo in repos:
-            topics_html = ''.join([f'<span class="inline-block bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-300 text-xs font-semibold mr-2 mb-2 px-2.5 py-0.5 rounded-full">{topic}</span>' for topic in repo.get('topics', [])[:5]])
-            html_content += f"""
+
+TOPIC_TEMPLATE = '<span class="inline-block bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-300 text-xs font-semibold mr-2 mb-2 px-2.5 py-0.5 rounded-full">{}</span>'
+
+CARD_TEMPLATE = """
             <div class="bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-lg shadow-sm hover:shadow-lg transition-shadow duration-300 p-6 flex flex-col">
                 <div class="flex-grow">
                     <h2 class="text-xl font-bold text-gray-900 dark:text-gray-100 mb-2">
-                        <a href="{repo.get('html_url', '#')}" target="_blank" class="hover:text-blue-600 dark:hover:text-blue-400 transition-colors">{repo['name']}</a>
+                        <a href="{html_url}" target="_blank" class="hover:text-blue-600 dark:hover:text-blue-400 transition-colors">{name}</a>
                     </h2>
-                    <p class="text-gray-600 dark:text-gray-300 mb-4 text-sm h-24 overflow-auto">{repo.get('description', 'No description available.')}</p>
+                    <p class="text-gray-600 dark:text-gray-300 mb-4 text-sm h-24 overflow-auto">{description}</p>
+                    {excerpt_html}
                 </div>
                 <div class="mt-auto pt-4 border-t border-gray-100 dark:border-gray-700">
                     <div class="h-14 overflow-y-auto mb-4">
                         {topics_html}
                     </div>
+                    {details_html}
                     <div class="flex justify-between items-center text-sm text-gray-500 dark:text-gray-400">
-                        <span class="font-semibold">⭐ {repo.get('stars', 0):,}</span>
-                        <span class="font-semibold text-purple-600 dark:text-purple-400">{repo.get('language', 'N/A')}</span>
-                        <span>Updated: {repo.get('last_updated', 'N/A')}</span>
+                        <span class="font-semibold">⭐ {stars:,}</span>
+                        <span class="font-semibold text-purple-600 dark:text-purple-400">{language}</span>
+                        <span>Updated: {last_updated}</span>
                     </div>
                 </div>
             </div>
             """
 
-    html_content += """
+PAGE_FOOTER = """
             </main>
+            <div id="load-more" class="text-center py-8 text-gray-500 dark:text-gray-400" aria-live="polite"></div>
             <footer class="text-center mt-12 text-gray-500 dark:text-gray-400">
                 <p>Generated by AI Repository Curator | <a href="https://github.com/hexacron/ai-curator" class="hover:text-blue-600 dark:hover:text-blue-400" target="_blank">View on GitHub</a></p>
             </footer>
         </div>
+        <script src="app.js" defer></script>
     </body>
     </html>
     """
 
-    with open(os.path.join(docs_dir, 'index.html'), 'w', encoding='utf-8') as f:
-        f.write(html_content)
+# Renders the remaining shards listed in repos.json as the visitor scrolls, and
+# answers searches from search.json. Card markup mirrors CARD_TEMPLATE.
+APP_SCRIPT = """(function () {
+    const grid = document.getElementById('repo-grid');
+    const sentinel = document.getElementById('load-more');
+    if (!grid) return;
+
+    const escapeHtml = (value) => String(value).replace(/[&<>"']/g, (c) => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+
+    function renderCard(row) {
+        const [name, url, description, stars, language, updated, topics, excerpt, details] = row;
+        const topicsHtml = topics.slice(0, 5).map((topic) =>
+            `<span class="inline-block bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-300 text-xs font-semibold mr-2 mb-2 px-2.5 py-0.5 rounded-full">${escapeHtml(topic)}</span>`
+        ).join('');
+        const excerptHtml = excerpt
+            ? `<p class="text-gray-500 dark:text-gray-400 mb-4 text-xs h-16 overflow-auto">${escapeHtml(excerpt)}</p>` : '';
+        const detailsHtml = details && details.length
+            ? `<div class="flex flex-wrap gap-x-3 text-xs text-gray-500 dark:text-gray-400 mb-3">${
+                details.map((detail) => `<span>${escapeHtml(detail)}</span>`).join('')}</div>` : '';
+        return `<div class="bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-lg shadow-sm hover:shadow-lg transition-shadow duration-300 p-6 flex flex-col">
+            <div class="flex-grow">
+                <h2 class="text-xl font-bold text-gray-900 dark:text-gray-100 mb-2">
+                    <a href="${escapeHtml(url)}" target="_blank" class="hover:text-blue-600 dark:hover:text-blue-400 transition-colors">${escapeHtml(name)}</a>
+                </h2>
+                <p class="text-gray-600 dark:text-gray-300 mb-4 text-sm h-24 overflow-auto">${escapeHtml(description)}</p>
+                ${excerptHtml}
+            </div>
+            <div class="mt-auto pt-4 border-t border-gray-100 dark:border-gray-700">
+                <div class="h-14 overflow-y-auto mb-4">${topicsHtml}</div>
+                ${detailsHtml}
+                <div class="flex justify-between items-center text-sm text-gray-500 dark:text-gray-400">
+                    <span class="font-semibold">⭐ ${Number(stars).toLocaleString('en-US')}</span>
+                    <span class="font-semibold text-purple-600 dark:text-purple-400">${escapeHtml(language)}</span>
+                    <span>Updated: ${escapeHtml(updated)}</span>
+                </div>
+            </div>
+        </div>`;
+    }
+
+    // --- Data shards ---
+    let manifestPromise = null;
+    const shardCache = new Map();
+
+    function loadManifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetch('repos.json').then((response) => response.json());
+        }
+        return manifestPromise;
+    }
+
+    function loadShard(number) {
+        if (!shardCache.has(number)) {
+            shardCache.set(number, loadManifest()
+                .then((manifest) => fetch(manifest.shards[number]))
+                .then((response) => response.json())
+                .then((shard) => shard.rows));
+        }
+        return shardCache.get(number);
+    }
+
+    // --- Infinite scroll ---
+    let nextShard = 1;  // The first shard is already inlined in index.html
+    let loading = false;
+    let observer = null;
+
+    async function loadNextShard() {
+        if (loading) return;
+        const manifest = await loadManifest();
+        if (nextShard >= manifest.shards.length) {
+            observer.disconnect();
+            sentinel.textContent = '';
+            return;
+        }
+        loading = true;
+        sentinel.textContent = 'Loading more repositories…';
+        try {
+            const rows = await loadShard(nextShard);
+            grid.insertAdjacentHTML('beforeend', rows.map(renderCard).join(''));
+            nextShard += 1;
+            sentinel.textContent = '';
+        } catch (error) {
+            sentinel.textContent = 'Could not load more repositories.';
+        } finally {
+            loading = false;
+        }
+    }
+
+    if (sentinel && 'IntersectionObserver' in window) {
+        observer = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) loadNextShard();
+        }, { rootMargin: '800px' });
+        loadManifest().then(() => observer.observe(sentinel)).catch(() => {});
+    }
+
+    // --- Search ---
+    const form = document.getElementById('search-form');
+    if (!form) return;
+    const textInput = document.getElementById('search-text');
+    const languageSelect = document.getElementById('search-language');
+    const topicInput = document.getElementById('search-topic');
+    const starsInput = document.getElementById('search-stars');
+    const resultsSection = document.getElementById('search-results');
+    const resultsGrid = document.getElementById('search-grid');
+    const summary = document.getElementById('search-summary');
+    const moreButton = document.getElementById('search-more');
+    const RESULTS_STEP = 60;
+
+    let indexPromise = null;
+    let results = [];
+    let shown = 0;
+    let generation = 0;
+
+    function loadIndex() {
+        if (!indexPromise) {
+            indexPromise = fetch('search.json').then((response) => response.json()).then((index) => {
+                // Postings are delta-encoded ascending document ids
+                index.postings = index.postings.map((deltas) => {
+                    let id = 0;
+                    return deltas.map((delta) => (id += delta));
+                });
+                languageSelect.insertAdjacentHTML('beforeend', index.languages
+                    .map((language) => `<option value="${escapeHtml(language)}">${escapeHtml(language)}</option>`).join(''));
+                document.getElementById('search-topics').innerHTML = index.topics
+                    .map((topic) => `<option value="${escapeHtml(topic)}">`).join('');
+                return index;
+            });
+        }
+        return indexPromise;
+    }
+
+    function lowerBound(sorted, value) {
+        let low = 0;
+        let high = sorted.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (sorted[mid] < value) low = mid + 1; else high = mid;
+        }
+        return low;
+    }
+
+    function matchPrefix(index, term) {
+        const ids = new Set();
+        for (let i = lowerBound(index.tokens, term); i < index.tokens.length && index.tokens[i].startsWith(term); i++) {
+            for (const id of index.postings[i]) ids.add(id);
+        }
+        return ids;
+    }
+
+    function runQuery(index, text, language, topic, minStars) {
+        let candidates = null;
+        for (const term of text.toLowerCase().match(/[a-z0-9]+/g) || []) {
+            const ids = matchPrefix(index, term);
+            candidates = candidates === null ? ids : new Set([...candidates].filter((id) => ids.has(id)));
+            if (!candidates.size) return [];
+        }
+        const languageId = language ? index.languages.indexOf(language) : -1;
+        const topicId = topic ? index.topics.indexOf(topic) : -1;
+        if ((language && languageId < 0) || (topic && topicId < 0)) return [];
+
+        // Document ids follow star order, so ascending ids are already ranked
+        const ids = candidates === null ? index.stars.map((_, id) => id) : [...candidates].sort((a, b) => a - b);
+        return ids.filter((id) => index.stars[id] >= minStars
+            && (languageId < 0 || index.language[id] === languageId)
+            && (topicId < 0 || index.doc_topics[id].includes(topicId)));
+    }
+
+    async function renderResults(index, run) {
+        const batch = results.slice(shown, shown + RESULTS_STEP);
+        const rows = await Promise.all(batch.map((id) =>
+            loadShard(Math.floor(id / index.page_size)).then((shardRows) => shardRows[id % index.page_size])));
+        if (run !== generation) return;
+        resultsGrid.insertAdjacentHTML('beforeend', rows.map(renderCard).join(''));
+        shown += batch.length;
+        moreButton.classList.toggle('hidden', shown >= results.length);
+    }
+
+    async function search() {
+        const run = ++generation;
+        const text = textInput.value.trim();
+        const language = languageSelect.value;
+        const topic = topicInput.value.trim().toLowerCase();
+        const minStars = Number(starsInput.value) || 0;
+        const active = text || language || topic || minStars;
+
+        grid.classList.toggle('hidden', Boolean(active));
+        if (sentinel) sentinel.classList.toggle('hidden', Boolean(active));
+        resultsSection.classList.toggle('hidden', !active);
+        resultsGrid.innerHTML = '';
+        shown = 0;
+        if (!active) return;
+
+        const index = await loadIndex();
+        if (run !== generation) return;
+        results = runQuery(index, text, language, topic, minStars);
+        summary.textContent = `${results.length.toLocaleString('en-US')} matching repositories`;
+        await renderResults(index, run);
+    }
+
+    let debounce = null;
+    form.addEventListener('input', () => {
+        clearTimeout(debounce);
+        debounce = setTimeout(search, 120);
+    });
+    textInput.addEventListener('focus', () => loadIndex().catch(() => {}), { once: true });
+    languageSelect.addEventListener('focus', () => loadIndex().catch(() => {}), { once: true });
+    moreButton.addEventListener('click', () => loadIndex().then((index) => renderResults(index, generation)));
+})();
+"""
+
+# Enrichment fragments, left out entirely when the curator has not fetched details
+EXCERPT_TEMPLATE = '<p class="text-gray-500 dark:text-gray-400 mb-4 text-xs h-16 overflow-auto">{}</p>'
+DETAILS_TEMPLATE = '<div class="flex flex-wrap gap-x-3 text-xs text-gray-500 dark:text-gray-400 mb-3">{}</div>'
+DETAIL_TEMPLATE = '<span>{}</span>'
+
+_format_topic = TOPIC_TEMPLATE.format
+_format_card = CARD_TEMPLATE.format
+
+
+def _normalize_repo(raw_repo):
+    """Normalize repository schema from cache.json and repositories.json."""
+    topics = raw_repo.get('topics', [])
+    if not isinstance(topics, list):
+        topics = []
+
+    return {
+        'name': raw_repo.get('name', 'Unknown'),
+        'full_name': raw_repo.get('full_name', raw_repo.get('name', 'Unknown')),
+        'html_url': raw_repo.get('html_url') or raw_repo.get('url') or '#',
+        'description': raw_repo.get('description') or DEFAULT_DESCRIPTION,
+        'stars': int(raw_repo.get('stars', 0) or 0),
+        'language': raw_repo.get('language') or 'N/A',
+        'last_updated': raw_repo.get('last_updated') or raw_repo.get('updated') or 'N/A',
+        'topics': topics,
+        **{detail: raw_repo.get(detail) for detail in DETAIL_FIELDS},
+    }
+
+
+# Scratch table for the streaming merge: one row per repository key, so memory
+# stays flat and SQLite does the final ordering (on disk for large inputs)
+MERGE_SCHEMA = """
+CREATE TABLE merged (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    stars INTEGER NOT NULL,
+    topic_count INTEGER NOT NULL,
+    record TEXT NOT NULL
+)
+"""
+# Prefer the entry with more stars, then with more topics; position keeps the first sighting
+MERGE_SQL = """
+INSERT INTO merged (key, position, stars, topic_count, record) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    stars = excluded.stars, topic_count = excluded.topic_count, record = excluded.record
+WHERE excluded.stars > merged.stars
+   OR (excluded.stars = merged.stars AND excluded.topic_count > merged.topic_count)
+"""
+
+
+def _merge_repo_stream(raw_repos):
+    """Normalize and deduplicate a repository stream by URL, yielding it ordered by stars."""
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        conn = sqlite3.connect(os.path.join(scratch_dir, 'merge.db'))
+        try:
+            conn.execute(MERGE_SCHEMA)
+            with conn:
+                for position, raw_repo in enumerate(raw_repos):
+                    repo = _normalize_repo(raw_repo)
+                    key = repo['html_url'] if repo['html_url'] != '#' else repo['full_name']
+                    conn.execute(MERGE_SQL, (key, position, repo['stars'], len(repo['topics']), _json_text(repo)))
+            # Ties keep their first-seen order, as the old stable sort did
+            for (record,) in conn.execute('SELECT record FROM merged ORDER BY stars DESC, position'):
+                yield json.loads(record)
+        finally:
+            conn.close()
+
+
+def _iter_cache_records(cache_file):
+    """Stream repository dicts from cache.json, columnar rows or the older repositories list."""
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        reader = JSONStreamReader(f)
+        fields, pending = None, []
+        for name in reader.iter_object_keys():
+            if name == 'fields':
+                fields = reader.decode_value()
+                yield from (dict(zip(fields, row)) for row in pending)
+                pending = []
+            elif name == 'rows' and reader.peek_type() == 'array':
+                # The curator writes fields first; rows seen before them are held back
+                for row in reader.iter_array():
+                    if fields is None:
+                        pending.append(row)
+                    else:
+                        yield dict(zip(fields, row))
+            elif name == 'repositories' and reader.peek_type() == 'array':
+                yield from reader.iter_array()
+            else:
+                reader.decode_value()
+
+
+def _iter_source(path, records):
+    """Pass records through, counting them and warning instead of failing on a bad file."""
+    count = 0
+    try:
+        for record in records:
+            count += 1
+            yield record
+    except (ValueError, IOError) as e:
+        print(f"⚠️ Could not read or parse {path} after {count} repositories: {e}")
+        return
+    print(f"✅ Found {count} repositories in {path}.")
+
+
+def _fallback_path():
+    """The legacy repository list, preferring the JSON-Lines form when both exist."""
+    for path in FALLBACK_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _seed_store_from_fallback(store, fallback_path=None):
+    """Import the legacy repositories list once, without overwriting curator data."""
+    fallback_path = fallback_path or _fallback_path()
+    if not fallback_path or store.get_meta('seeded_from') == fallback_path:
+        return
+
+    def records():
+        # Map the legacy url/updated keys onto the store's column names
+        for raw_repo in iter_records(fallback_path):
+            repo = _normalize_repo(raw_repo)
+            yield dict(
+                raw_repo,
+                full_name=repo['full_name'],
+                html_url=repo['html_url'],
+                last_updated=repo['last_updated']
+            )
+
+    try:
+        added = store.upsert(records(), only_missing=True)
+        store.mark_legacy(_normalize_repo(raw_repo)['full_name'] for raw_repo in iter_records(fallback_path))
+    except (ValueError, IOError) as e:
+        print(f"⚠️ Could not read or parse {fallback_path}: {e}")
+        return
+    store.set_meta('seeded_from', fallback_path)
+    print(f"✅ Seeded {added} repositories from {fallback_path} into the store.")
+
+
+def _load_repos_from_store(store_path):
+    """Stream the latest published and legacy repositories from the SQLite store, already ordered by stars."""
+    with RepoStore(store_path) as store:
+        _seed_store_from_fallback(store)
+        for record in store.iter_repos(seen_since=store.published_at()):
+            yield _normalize_repo(record)
+
+
+def _load_repos_from_json():
+    """Stream, normalize and merge repositories from cache.json and the legacy fallback list."""
+    def sources():
+        if os.path.exists(CACHE_PATH):
+            yield from _iter_source(CACHE_PATH, _iter_cache_records(CACHE_PATH))
+        fallback_path = _fallback_path()
+        if fallback_path:
+            yield from _iter_source(fallback_path, iter_records(fallback_path))
+
+    return _merge_repo_stream(sources())
+
+
+def _load_config(config_path=CONFIG_PATH):
+    """The curator's config.json, or an empty config when it is missing or unreadable."""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def _store_path(config):
+    """The curator's store_path, with its default; empty when the store is disabled."""
+    return config.get('store_path', STORE_PATH)
+
+
+def _near_duplicate_settings(config):
+    """The curator's advanced_options.near_duplicates section, if the config enables it."""
+    settings = config.get('advanced_options', {}).get('near_duplicates', {})
+    return settings if settings.get('enabled') else None
+
+
+def _collapse_near_duplicates(repos, settings):
+    """Drop near-duplicate records, keeping the highest-starred of each cluster in place."""
+    by_stars = sorted(repos, key=lambda repo: repo['stars'], reverse=True)
+    token_sets = [repo_tokens(repo['name'], repo['description'], repo['topics']) for repo in by_stars]
+    kept, clusters = collapse(by_stars, token_sets, **settings)
+    for cluster in clusters:
+        names = ', '.join(repo['full_name'] or repo['name'] for repo in cluster[1:])
+        print(f"🔁 Near-duplicates of {cluster[0]['full_name'] or cluster[0]['name']}: {names}")
+    kept_ids = {id(repo) for repo in kept}
+    return [repo for repo in repos if id(repo) in kept_ids]
+
+
+def _detail_labels(repo):
+    """Short enrichment labels for a card: release, contributors and last commit."""
+    labels = []
+    if repo.get('latest_release'):
+        released = f" ({repo['release_published_at']})" if repo.get('release_published_at') else ''
+        labels.append(f"🏷️ {repo['latest_release']}{released}")
+    if repo.get('contributors'):
+        count = repo['contributors']
+        labels.append(f"👥 {count}{'+' if count >= CONTRIBUTORS_PAGE else ''} contributors")
+    if repo.get('last_commit'):
+        labels.append(f"📝 Last commit: {repo['last_commit']}")
+    return labels
+
+
+def _render_card(repo):
+    """Render a single repository card from the precompiled template."""
+    topics_html = ''.join([_format_topic(topic) for topic in repo.get('topics', [])[:5]])
+    excerpt = repo.get('readme_excerpt')
+    labels = _detail_labels(repo)
+    return _format_card(
+        html_url=repo.get('html_url', '#'),
+        name=repo['name'],
+        description=repo.get('description', DEFAULT_DESCRIPTION),
+        topics_html=topics_html,
+        stars=repo.get('stars', 0),
+        language=repo.get('language', 'N/A'),
+        last_updated=repo.get('last_updated', 'N/A'),
+        excerpt_html=EXCERPT_TEMPLATE.format(html.escape(excerpt)) if excerpt else '',
+        details_html=DETAILS_TEMPLATE.format(
+            ''.join(DETAIL_TEMPLATE.format(html.escape(label)) for label in labels)
+        ) if labels else '',
+    )
+
+
+def iter_html(repos, timestamp):
+    """Yield the page as a stream of fragments, one per repository card."""
+    yield PAGE_HEADER.format(timestamp=timestamp)
+    rendered_any = False
+    for repo in repos:
+        rendered_any = True
+        yield _render_card(repo)
+    if not rendered_any:
+        yield EMPTY_STATE
+    yield PAGE_FOOTER
+
+
+def write_html(repos, output_path, timestamp):
+    """Stream rendered fragments straight to the output file."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_html(repos, timestamp))
+
+
+def _compact_row(repo):
+    """Positional row for the JSON shards, in the order APP_SCRIPT unpacks it."""
+    return [
+        repo['name'],
+        repo.get('html_url', '#'),
+        repo.get('description', DEFAULT_DESCRIPTION),
+        repo.get('stars', 0),
+        repo.get('language', 'N/A'),
+        repo.get('last_updated', 'N/A'),
+        repo.get('topics', []),
+        repo.get('readme_excerpt'),
+        _detail_labels(repo),
+    ]
+
+
+def _iter_pages(repos, page_size):
+    """Group a repository stream into lists of at most page_size records."""
+    page = []
+    for repo in repos:
+        page.append(repo)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _json_text(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _record_hash(repo):
+    """Hash of a normalized record; any field change re-renders its shard."""
+    return _digest(json.dumps(repo, ensure_ascii=False, sort_keys=True))
+
+
+# Template or client-script edits must invalidate every output, not just changed records
+TEMPLATE_HASH = _digest(''.join([PAGE_HEADER, EMPTY_STATE, TOPIC_TEMPLATE, CARD_TEMPLATE, PAGE_FOOTER, APP_SCRIPT,
+                                 EXCERPT_TEMPLATE, DETAILS_TEMPLATE, DETAIL_TEMPLATE]))
+
+
+def _load_manifest(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+class BuildState:
+    """Content hashes of the previous and current build, used to skip unchanged files."""
+
+    def __init__(self, docs_dir, previous):
+        self.docs_dir = docs_dir
+        self.previous_files = previous.get('files', {})
+        self.previous_pages = previous.get('pages', [])
+        self.files = {}
+        self.written = 0
+        self.skipped = 0
+        self.repos = 0
+
+    def unchanged(self, name, content_hash):
+        """True when name was last built from content_hash and is still on disk."""
+        return (content_hash is not None
+                and self.previous_files.get(name) == content_hash
+                and os.path.exists(os.path.join(self.docs_dir, name)))
+
+    def write(self, name, text):
+        """Write text to docs_dir/name unless the last build produced identical bytes."""
+        content_hash = _digest(text)
+        self.files[name] = content_hash
+        if self.unchanged(name, content_hash):
+            self.skipped += 1
+            return False
+        with open(os.path.join(self.docs_dir, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.written += 1
+        return True
+
+    def keep(self, name):
+        """Carry an unchanged file over without re-rendering it."""
+        self.files[name] = self.previous_files[name]
+        self.skipped += 1
+
+
+class SearchIndexBuilder:
+    """Accumulate a compact inverted index over repositories in render order."""
+
+    def __init__(self):
+        self.postings = {}
+        self.stars = []
+        self.language = []
+        self.doc_topics = []
+        self.language_ids = {}
+        self.topic_ids = {}
+
+    def add(self, repo):
+        doc_id = len(self.stars)
+        description = repo.get('description') or ''
+        if description == DEFAULT_DESCRIPTION:
+            description = ''
+        text = ' '.join([repo['name'], repo.get('full_name', ''), description,
+                         ' '.join(repo.get('topics', [])), repo.get('language') or ''])
+        for token in set(SEARCH_TOKEN_RE.findall(text.lower())):
+            if len(token) > 1:
+                self.postings.setdefault(token, []).append(doc_id)
+
+        self.stars.append(repo.get('stars', 0))
+        language = repo.get('language', 'N/A')
+        self.language.append(self.language_ids.setdefault(language, len(self.language_ids)))
+        self.doc_topics.append([
+            self.topic_ids.setdefault(topic.lower(), len(self.topic_ids)) for topic in repo.get('topics', [])
+        ])
+
+    def to_json(self, page_size):
+        """Sorted vocabulary with delta-encoded postings, plus per-document facets."""
+        tokens = sorted(self.postings)
+        postings = []
+        for token in tokens:
+            ids = self.postings[token]
+            postings.append([ids[0]] + [current - previous for previous, current in zip(ids, ids[1:])])
+        return {
+            'page_size': page_size,
+            'tokens': tokens,
+            'postings': postings,
+            'stars': self.stars,
+            'languages': list(self.language_ids),
+            'language': self.language,
+            'topics': list(self.topic_ids),
+            'doc_topics': self.doc_topics,
+        }
+
+
+def write_site(repos, docs_dir, timestamp, page_size=PAGE_SIZE, manifest_path=None):
+    """
+    Write index.html with the first page of cards inline, one JSON shard per
+    page under data/, a repos.json manifest the page loads on scroll and a
+    search.json index for client-side filtering.
+
+    With a manifest_path, each page is hashed from its records' hashes and
+    only shards whose page changed are re-rendered; files whose bytes match
+    the previous build are not rewritten, and the previous timestamp is kept
+    when no content changed at all. repos may be any iterable and is consumed
+    once, page by page. Returns the shard list and BuildState.
+    """
+    data_dir = os.path.join(docs_dir, DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    previous = _load_manifest(manifest_path)
+    build = BuildState(docs_dir, previous)
+
+    search_index = SearchIndexBuilder()
+    shards = []
+    page_hashes = []
+    first_page = []
+    for number, page in enumerate(_iter_pages(repos, page_size), 1):
+        for repo in page:
+            search_index.add(repo)
+        if number == 1:
+            first_page = page
+        shard = f"{DATA_DIR}/repos-{number}.json"
+        page_hash = _digest(TEMPLATE_HASH + ''.join(_record_hash(repo) for repo in page))
+        page_hashes.append(page_hash)
+        if len(build.previous_pages) >= number and build.previous_pages[number - 1] == page_hash \
+                and build.unchanged(shard, build.previous_files.get(shard)):
+            build.keep(shard)
+        else:
+            build.write(shard, _json_text({'rows': [_compact_row(repo) for repo in page]}))
+        shards.append(shard)
+        build.repos += len(page)
+
+    content_hash = _digest(f"{page_size}:{TEMPLATE_HASH}:{':'.join(page_hashes)}")
+    if previous.get('content_hash') == content_hash and previous.get('timestamp'):
+        # Nothing a visitor can see changed, so the "last updated" stamp stays put too
+        timestamp = previous['timestamp']
+
+    build.write('index.html', ''.join(iter_html(first_page, timestamp)))
+    build.write('repos.json', _json_text({
+        'generated': timestamp,
+        'total': build.repos,
+        'page_size': page_size,
+        'fields': ['name', 'html_url', 'description', 'stars', 'language', 'last_updated', 'topics',
+                   'readme_excerpt', 'details'],
+        'shards': shards,
+    }))
+    build.write('search.json', _json_text(search_index.to_json(page_size)))
+    build.write('app.js', APP_SCRIPT)
+
+    # Drop shards left over from a previous, larger build
+    for path in glob.glob(os.path.join(data_dir, 'repos-*.json')):
+        if f"{DATA_DIR}/{os.path.basename(path)}" not in shards:
+            os.remove(path)
+
+    if manifest_path:
+        manifest = {'timestamp': timestamp, 'content_hash': content_hash, 'pages': page_hashes, 'files': build.files}
+        if manifest != previous:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return shards, build
+
+
+def generate_website(config_path=CONFIG_PATH):
+    """
+    Generates a clean, self-contained HTML website from repository data,
+    ensuring no external artifacts are included. Settings are read from the
+    curator's config at config_path.
+    """
+    
+    metrics = RunMetrics('website')
+
+    # --- Setup and Data Loading ---
+    docs_dir = 'docs'
+    if not os.path.exists(docs_dir):
+        os.makedirs(docs_dir)
+
+    with metrics.span('load'):
+        config = _load_config(config_path)
+        store_path = _store_path(config)
+        from_store = bool(store_path) and os.path.exists(store_path)
+        repos = _load_repos_from_store(store_path) if from_store else _load_repos_from_json()
+
+        # Collapsing compares every repository with the rest, so only then is the stream materialized
+        near_duplicate_settings = _near_duplicate_settings(config)
+        if near_duplicate_settings:
+            repos = list(repos)
+            before = len(repos)
+            repos = _collapse_near_duplicates(repos, near_duplicate_settings)
+            metrics.incr('near_duplicates_dropped', before - len(repos))
+            print(f"✅ Collapsed {before - len(repos)} near-duplicate repositories.")
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+    # --- HTML Generation ---
+    # Loading is lazy, so the span also covers reading and merging the sources
+    with metrics.span('write_site'):
+        shards, build = write_site(repos, docs_dir, timestamp, manifest_path=MANIFEST_PATH)
+    if from_store:
+        print(f"✅ Used {build.repos} repositories from {store_path}.")
+    else:
+        print(f"✅ Used {build.repos} merged repositories after normalization and deduplication.")
+    metrics.gauge('repos', build.repos)
+    metrics.gauge('shards', len(shards))
+    metrics.incr('files_written', build.written)
+    metrics.incr('files_unchanged', build.skipped)
 
-    print(f"✅ Successfully generated clean website at {os.path.join(docs_dir, 'index.html')}.")
+    print(f"✅ Successfully generated clean website at {os.path.join(docs_dir, 'index.html')} with {len(shards)} data shards.")
+    print(f"📝 Wrote {build.written} files, left {build.skipped} unchanged.")
+    print(f"⏱️  {metrics.summary()}")
+    # The curator's metrics_file; empty turns the report off for both
+    metrics.write(config.get('advanced_options', {}).get('metrics_file', METRICS_PATH))
 
 if __name__ == "__main__":
     generate_website()
@@ -0,0 +1,152 @@
+"""Record/replay transport that can stand in for the curator's requests.Session.
+
+A RecordingSession forwards requests to a real (or synthetic) session and
+writes every response to a fixture file. A ReplaySession serves those
+fixtures back without touching the network, with optional synthetic latency
+and rate-limit headers, and counts requests and bytes for benchmarks.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+# Headers worth keeping in fixtures; everything else is noise for replay
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link', 'Retry-After',
+                    'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset',
+                    'X-RateLimit-Resource', 'X-RateLimit-Used', 'X-OAuth-Scopes')
+
+# The recency qualifier moves every day; ignore its date so fixtures stay replayable
+PUSHED_DATE_RE = re.compile(r'pushed:>=\d{4}-\d{2}-\d{2}')
+
+
+def fixture_key(method: str, url: str, params: Optional[Dict] = None, json_body: Optional[Dict] = None) -> str:
+    """Stable file name for a request, independent of parameter order"""
+    # Normalized before encoding: urlencode escapes the ':>=' the pattern looks for
+    items = sorted((name, PUSHED_DATE_RE.sub('pushed:>=*', value) if isinstance(value, str) else value)
+                   for name, value in (params or {}).items())
+    parts = [method.upper(), url, urlencode(items)]
+    if json_body is not None:
+        parts.append(json.dumps(json_body, sort_keys=True))
+    return hashlib.sha1(PUSHED_DATE_RE.sub('pushed:>=*', '\n'.join(parts)).encode('utf-8')).hexdigest()
+
+
+class RecordedResponse:
+    """The subset of requests.Response the curator reads"""
+
+    def __init__(self, status_code: int, headers: Dict, body: str):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = body
+        self.content = body.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class RecordingSession:
+    """Forward requests to an inner session and save each response as a fixture"""
+
+    def __init__(self, fixtures_dir: str, inner=None):
+        if inner is None:
+            import requests
+            inner = requests.Session()
+        self.inner = inner
+        self.headers = inner.headers
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+
+    def mount(self, prefix, adapter):
+        self.inner.mount(prefix, adapter)
+
+    def _record(self, method, url, params, json_body, response):
+        fixture = {
+            'method': method,
+            'url': url,
+            'params': params,
+            'json': json_body,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': response.text,
+        }
+        path = self.fixtures_dir / f"{fixture_key(method, url, params, json_body)}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, indent=2)
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        # Record the full response, not a 304 for a validator only this run knew about
+        response = self.inner.get(url, params=params, timeout=timeout)
+        return self._record('GET', url, params, None, response)
+
+    def post(self, url, json=None, timeout=None):
+        response = self.inner.post(url, json=json, timeout=timeout)
+        return self._record('POST', url, None, json, response)
+
+
+class ReplaySession:
+    """Serve recorded fixtures with synthetic latency and a simulated rate-limit window"""
+
+    def __init__(self, fixtures_dir: str, latency_seconds: float = 0.0,
+                 rate_limit: int = 30, window_seconds: float = 60.0):
+        self.headers: Dict[str, str] = {}
+        self.fixtures_dir = Path(fixtures_dir)
+        self.latency_seconds = latency_seconds
+        self.rate_limit = rate_limit
+        self.window_seconds = window_seconds
+        self.request_count = 0
+        self.bytes_transferred = 0
+        self.missing = 0
+        self._window_start = time.time()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start = now
+                self._used = 0
+            self._used += 1
+            return {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(max(0, self.rate_limit - self._used)),
+                'X-RateLimit-Reset': str(int(self._window_start + self.window_seconds)),
+            }
+
+    def _replay(self, method, url, params=None, json_body=None, headers=None):
+        time.sleep(self.latency_seconds)
+        path = self.fixtures_dir / f"{fixture_key(method, url, params, json_body)}.json"
+        rate_headers = self._rate_limit_headers()
+        if not path.exists():
+            with self._lock:
+                self.request_count += 1
+                self.missing += 1
+            return RecordedResponse(404, rate_headers, json.dumps({'message': f"No fixture for {method} {url}"}))
+
+        with open(path, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+        response_headers = dict(fixture['headers'], **rate_headers)
+        etag = fixture['headers'].get('ETag')
+        if etag and headers and headers.get('If-None-Match') == etag:
+            response = RecordedResponse(304, response_headers, '')
+        else:
+            response = RecordedResponse(fixture['status'], response_headers, fixture['body'])
+        with self._lock:
+            self.request_count += 1
+            self.bytes_transferred += len(response.content)
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self._replay('GET', url, params=params, headers=headers)
+
+    def post(self, url, json=None, timeout=None):
+        return self._replay('POST', url, json_body=json)
@@ -0,0 +1,140 @@
+"""Incremental readers for large JSON and JSON-Lines files.
+
+JSONStreamReader walks a document with the stdlib decoder's raw_decode over a
+bounded, sliding text buffer, so array elements can be consumed one at a time
+and memory stays flat however long the array is. iter_records picks the
+right reader for a repository file by extension.
+"""
+import json
+from typing import Any, Iterator, Optional
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+# Characters that can continue a JSON number
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+class JSONStreamReader:
+    """Pull-style reader over one JSON document in a text file object"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping text already consumed; False at end of file"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next significant character, or '' at end of file"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode the next complete value"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off at the buffer edge decodes fine but short ("17600" or "1760000000." or "1e"),
+            # so make sure what follows it cannot continue it
+            if (end == len(self._buffer) or self._is_cut_number(value, self._buffer[end])) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    @staticmethod
+    def _is_cut_number(value: Any, following: str) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and following in NUMBER_CHARS
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator or 'end of file'!r}")
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Yield each key of the object at the current position
+
+        After every key the caller must consume its value, with decode_value or
+        iter_array, before asking for the next key.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self._expect(':')
+            yield key
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' in JSON object, found {separator or 'end of file'!r}")
+
+    def peek_type(self) -> Optional[str]:
+        """'array', 'object' or None for scalars, without consuming anything"""
+        char = self._peek()
+        return {'[': 'array', '{': 'object'}.get(char)
+
+
+def iter_json_lines(f) -> Iterator[Any]:
+    """Yield one decoded value per non-blank line"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(path: str, key: Optional[str] = None) -> Iterator[Any]:
+    """Stream records from a .jsonl file, a top-level JSON array, or the array under key"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            yield from iter_json_lines(f)
+            return
+        reader = JSONStreamReader(f)
+        if reader.peek_type() == 'array':
+            yield from reader.iter_array()
+            return
+        for name in reader.iter_object_keys():
+            if name == key and reader.peek_type() == 'array':
+                yield from reader.iter_array()
+                return
+            reader.decode_value()
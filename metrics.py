@@ -0,0 +1,86 @@
+"""Lightweight run instrumentation shared by the curator and the website generator.
+
+RunMetrics collects named timing spans, counters, gauges and per-query stats
+for one run and appends a JSON report line to a file for trend tracking.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class RunMetrics:
+    """Thread-safe timers and counters for a single run"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.spans: Dict[str, list] = {}  # name -> [count, total seconds, max seconds]
+        self.counters: Counter = Counter()
+        self.gauges: Dict[str, float] = {}
+        self.queries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block under name; repeated spans accumulate"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self.spans.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def query(self, query: str, **stats):
+        """Attach per-query stats such as items seen and accepted"""
+        with self._lock:
+            self.queries.setdefault(query, {}).update(stats)
+
+    def report(self) -> Dict:
+        """Machine-readable summary; span totals can exceed wall time when workers overlap"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'started_at': self.started_at,
+                'wall_seconds': round(time.perf_counter() - self._started, 6),
+                'spans': {
+                    name: {'count': count, 'total_seconds': round(total, 6), 'max_seconds': round(longest, 6)}
+                    for name, (count, total, longest) in sorted(self.spans.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+                'gauges': dict(sorted(self.gauges.items())),
+                'queries': self.queries,
+            }
+
+    def summary(self) -> str:
+        """One-line view of where the run's time went"""
+        report = self.report()
+        spans = sorted(report['spans'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)
+        timings = ', '.join(f"{name}={stats['total_seconds']:.2f}s" for name, stats in spans)
+        return f"{self.name} took {report['wall_seconds']:.2f}s: {timings or 'no spans'}"
+
+    def write(self, path: Optional[str]) -> Optional[Dict]:
+        """Append the report as one JSON line to path, if a path is configured"""
+        if not path:
+            return None
+        report = self.report()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, separators=(',', ':')) + '\n')
+        return report
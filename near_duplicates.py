@@ -0,0 +1,132 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding.
+
+Each repository is reduced to a set of tokens from its name, description and
+topics. MinHash signatures estimate the Jaccard similarity of those sets, and
+banding the signatures puts likely duplicates into shared buckets, so only
+bucket mates are compared instead of every pair. Candidates whose exact
+Jaccard similarity clears the threshold are clustered with union-find, and
+each cluster is represented by its earliest member, i.e. the best-ranked one
+when the input is already sorted.
+"""
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional; signatures fall back to pure Python
+    np = None
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+MERSENNE_PRIME = (1 << 61) - 1
+MASK_64 = (1 << 64) - 1
+# A band shared by this many repositories hashed only common words ("ai", "tool");
+# true duplicates agree on most bands, so such buckets are skipped rather than compared pairwise
+MAX_BUCKET_SIZE = 100
+
+DEFAULT_SETTINGS = {'threshold': 0.8, 'num_perm': 64, 'bands': 16, 'min_tokens': 4}
+
+
+def repo_tokens(name: str, description: Optional[str], topics: Iterable[str]) -> Set[str]:
+    """Token set compared between repositories"""
+    text = ' '.join([name or '', description or '', ' '.join(topics or [])])
+    return set(TOKEN_RE.findall(text.lower()))
+
+
+class MinHasher:
+    """Fixed random permutations shared by every signature in a run"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)]
+
+    @staticmethod
+    def _hashes(tokens: Set[str]) -> List[int]:
+        return [zlib.crc32(token.encode('utf-8')) for token in tokens]
+
+    def signature(self, tokens: Set[str]) -> Tuple[int, ...]:
+        hashes = self._hashes(tokens)
+        # Wrapping at 64 bits, as the NumPy path does, keeps both paths' signatures identical
+        return tuple(min(((a * x + b) & MASK_64) % MERSENNE_PRIME for x in hashes) for a, b in zip(self.a, self.b))
+
+    def signatures(self, token_sets: Sequence[Set[str]]) -> List[Tuple[int, ...]]:
+        """Signatures for many non-empty token sets, vectorized when NumPy is installed"""
+        if np is None or not token_sets:
+            return [self.signature(tokens) for tokens in token_sets]
+        lengths = np.fromiter((len(tokens) for tokens in token_sets), dtype=np.intp, count=len(token_sets))
+        hashes = np.fromiter((x for tokens in token_sets for x in self._hashes(tokens)), dtype=np.uint64,
+                             count=int(lengths.sum()))
+        a = np.asarray(self.a, dtype=np.uint64)[:, None]
+        b = np.asarray(self.b, dtype=np.uint64)[:, None]
+        values = (a * hashes[None, :] + b) % np.uint64(MERSENNE_PRIME)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return [tuple(column) for column in np.minimum.reduceat(values, starts, axis=1).T.tolist()]
+
+
+def _jaccard(left: Set[str], right: Set[str]) -> float:
+    return len(left & right) / len(left | right)
+
+
+def find_clusters(token_sets: Sequence[Set[str]], threshold: float = 0.8, num_perm: int = 64,
+                  bands: int = 16, min_tokens: int = 4) -> List[List[int]]:
+    """Group indexes of near-duplicate token sets; singletons are not returned
+
+    Sets with fewer than min_tokens tokens carry too little signal and are never
+    clustered. Each cluster is sorted, so its first index is the representative.
+    """
+    rows = max(1, num_perm // max(1, bands))
+    eligible = [index for index, tokens in enumerate(token_sets) if len(tokens) >= min_tokens]
+    signatures = MinHasher(rows * bands).signatures([token_sets[index] for index in eligible])
+
+    buckets: Dict[Tuple, List[int]] = {}
+    for index, signature in zip(eligible, signatures):
+        for band in range(bands):
+            buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(index)
+
+    parent = list(range(len(token_sets)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(left: int, right: int):
+        left, right = find(left), find(right)
+        if left != right:
+            # The lower index is the better-ranked repository and stays the root
+            parent[max(left, right)] = min(left, right)
+
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > MAX_BUCKET_SIZE:
+            continue
+        for left, right in ((left, right) for i, left in enumerate(members) for right in members[i + 1:]):
+            if (left, right) in compared or find(left) == find(right):
+                continue
+            compared.add((left, right))
+            if _jaccard(token_sets[left], token_sets[right]) >= threshold:
+                union(left, right)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in eligible:
+        clusters.setdefault(find(index), []).append(index)
+    return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+
+def collapse(items: Sequence, token_sets: Sequence[Set[str]], **settings) -> Tuple[List, List[List]]:
+    """Keep the first item of every near-duplicate cluster, preserving order
+
+    Returns the kept items and, for reporting, each cluster as a list of items
+    with its representative first.
+    """
+    options = dict(DEFAULT_SETTINGS)
+    options.update({key: value for key, value in settings.items() if key in DEFAULT_SETTINGS})
+    clusters = find_clusters(token_sets, float(options['threshold']), int(options['num_perm']),
+                             int(options['bands']), int(options['min_tokens']))
+    dropped = {index for members in clusters for index in members[1:]}
+    kept = [item for index, item in enumerate(items) if index not in dropped]
+    return kept, [[items[index] for index in members] for members in clusters]
@@ -0,0 +1,177 @@
+"""Search planning from earlier runs' per-query statistics.
+
+Small single-keyword queries whose results overlapped are OR-ed into one
+search, so a single page serves several of them; their results are
+attributed back to each member query by matching its terms, which keeps the
+per-query cache and query-hit ranking intact. A query whose matches ran
+past GitHub's 1000-result search window is split into star ranges (or
+pushed ranges when stars cannot separate it), each of which fits.
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from near_duplicates import repo_tokens
+
+SEARCH_RESULT_CAP = 1000
+MAX_QUERY_LENGTH = 256
+# GitHub rejects searches with more than five AND/OR/NOT operators
+MAX_OPERATORS = 5
+
+TERM_RE = re.compile(r'[a-z0-9]+')
+OPERATOR_RE = re.compile(r'\b(AND|OR|NOT)\b|[():]')
+
+# Only single-keyword queries are merged (see is_mergeable); the rest are only ever split
+DEFAULT_SETTINGS = {
+    'enabled': False,
+    'merge_max_results': 100,
+    'min_overlap': 0.2,
+    'max_merge': 3,
+    'split_saturated': True,
+}
+
+
+@dataclass
+class PlannedSearch:
+    """One search to send and the configured queries its results belong to"""
+    search: str
+    members: List[str]
+    kind: str = 'single'  # 'single', 'merged' or 'split'
+
+
+def is_plain(query: str) -> bool:
+    """Keywords only: no qualifiers, operators or grouping that an OR could change the meaning of"""
+    return not OPERATOR_RE.search(query)
+
+
+def is_mergeable(query: str) -> bool:
+    """A single keyword, so "a OR b" needs no grouping
+
+    Multi-word members would need "(a b) OR (c d)", and nothing recorded
+    shows how repository search scopes parentheses and the appended
+    qualifiers across OR, so they always run on their own.
+    """
+    return is_plain(query) and TERM_RE.fullmatch(query.strip().lower()) is not None
+
+
+def query_terms(query: str) -> List[str]:
+    return TERM_RE.findall(query.lower())
+
+
+def overlap(left: Set[str], right: Set[str]) -> float:
+    """Share of the smaller result set also returned by the other query"""
+    if not left or not right:
+        return 0.0
+    return len(left & right) / min(len(left), len(right))
+
+
+def matches(tokens: Set[str], terms: Sequence[str]) -> bool:
+    """Every term starts some token, a rough stand-in for GitHub's stemming ("agent" finds "agents")"""
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def attribute(repos: Sequence, members: List[str]) -> Dict[str, List]:
+    """Split a merged search's results between its member queries
+
+    A repository goes to every member whose terms it matches; one that
+    matches none (GitHub also searches fields not seen here) goes to the
+    first member so it is not lost.
+    """
+    terms = {member: query_terms(member) for member in members}
+    attributed: Dict[str, List] = {member: [] for member in members}
+    for repo in repos:
+        tokens = repo_tokens(repo.full_name.replace('/', ' '), repo.description, repo.topics)
+        hits = [member for member in members if matches(tokens, terms[member])]
+        for member in hits or members[:1]:
+            attributed[member].append(repo)
+    return attributed
+
+
+def merged_search(members: List[str]) -> str:
+    return ' OR '.join(member.strip() for member in members)
+
+
+def _split(query: str, stats: Dict, min_stars: int, pushed_after: Optional[date]) -> Optional[List[str]]:
+    """Two disjoint range searches covering a saturated query, or None when it cannot be split"""
+    pivot = stats.get('split_pivot') or stats.get('lowest_stars')
+    lower = max(min_stars, 0)
+    if pivot is not None and pivot > lower and 'stars:' not in query:
+        return [f"{query} stars:>{pivot}", f"{query} stars:{lower}..{pivot}"]
+    if pushed_after is not None and 'pushed:' not in query:
+        # pushed_after is a UTC date, so the range ends at today's UTC date too
+        middle = pushed_after + (datetime.now(timezone.utc).date() - pushed_after) / 2
+        return [f"{query} pushed:>={middle.isoformat()}",
+                f"{query} pushed:{pushed_after.isoformat()}..{(middle - timedelta(days=1)).isoformat()}"]
+    return None
+
+
+def is_saturated(stats: Optional[Dict], max_repos: int = 0) -> bool:
+    """Matched more than the search window and ran out of pages, or was split for that last time
+
+    A query whose first window already filled its max_repos quota gains
+    nothing from more ranges.
+    """
+    if not stats or (stats.get('total_count') or 0) <= SEARCH_RESULT_CAP:
+        return False
+    if max_repos and (stats.get('window_results') or 0) >= max_repos:
+        return False
+    return stats.get('stop_reason') == 'max_pages' or bool(stats.get('split_pivot'))
+
+
+def plan_searches(queries: List[str], stats: Dict[str, Dict], settings: Dict, min_stars: int = 0,
+                  pushed_after: Optional[date] = None, max_repos: int = 0,
+                  fits: Callable[[str], bool] = lambda search: len(search) <= MAX_QUERY_LENGTH) -> List[PlannedSearch]:
+    """Plan the searches for queries, in their configured order
+
+    stats maps each configured query to what its last fetch saw (total_count,
+    stop_reason, lowest_stars, window_results, repos). Queries without stats
+    run as they are; max_repos is the per-query quota.
+    fits reports whether a search, once qualifiers are added, is short enough.
+    """
+    options = dict(DEFAULT_SETTINGS, **settings)
+    max_merge = max(1, min(int(options['max_merge']), MAX_OPERATORS + 1))
+    merge_max_results = int(options['merge_max_results'])
+    planned: Dict[str, List[PlannedSearch]] = {}
+    candidates = []
+
+    for query in queries:
+        query_stats = stats.get(query)
+        if options['split_saturated'] and is_saturated(query_stats, max_repos):
+            parts = _split(query, query_stats, min_stars, pushed_after)
+            if parts and all(fits(part) for part in parts):
+                planned[query] = [PlannedSearch(part, [query], 'split') for part in parts]
+                continue
+        total = (query_stats or {}).get('total_count')
+        if max_merge > 1 and is_mergeable(query) and total is not None and total <= merge_max_results:
+            candidates.append(query)
+        else:
+            planned[query] = [PlannedSearch(query, [query])]
+
+    # Smallest first, each joining the group its past results overlap most
+    groups: List[Dict] = []
+    for query in sorted(candidates, key=lambda query: stats[query]['total_count']):
+        results = set(stats[query].get('repos') or [])
+        total = stats[query]['total_count']
+        best, best_overlap = None, float(options['min_overlap'])
+        for group in groups:
+            if len(group['members']) >= max_merge or group['total'] + total > merge_max_results:
+                continue
+            shared = overlap(results, group['results'])
+            if shared >= best_overlap and fits(merged_search(group['members'] + [query])):
+                best, best_overlap = group, shared
+        if best is None:
+            groups.append({'members': [query], 'results': results, 'total': total})
+        else:
+            best['members'].append(query)
+            best['results'] |= results
+            best['total'] += total
+
+    for group in groups:
+        members = sorted(group['members'], key=queries.index)
+        if len(members) == 1:
+            planned[members[0]] = [PlannedSearch(members[0], members)]
+        else:
+            planned[members[0]] = [PlannedSearch(merged_search(members), members, 'merged')]
+
+    return [search for query in queries for search in planned.get(query, [])]
@@ -0,0 +1,266 @@
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    full_name TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    html_url TEXT NOT NULL,
+    description TEXT,
+    stars INTEGER NOT NULL DEFAULT 0,
+    language TEXT,
+    last_updated TEXT,
+    topics TEXT NOT NULL DEFAULT '[]',
+    license_name TEXT,
+    is_fork INTEGER NOT NULL DEFAULT 0,
+    size_kb INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    -- When the curator last published the repository; NULL if it never has
+    last_seen REAL,
+    -- Listed in the legacy repositories file, which the site always shows
+    legacy INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_repos_stars ON repos (stars DESC);
+CREATE INDEX IF NOT EXISTS idx_repos_language ON repos (language);
+CREATE INDEX IF NOT EXISTS idx_repos_last_updated ON repos (last_updated);
+
+CREATE TABLE IF NOT EXISTS repo_topics (
+    full_name TEXT NOT NULL REFERENCES repos (full_name) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (full_name, topic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_repo_topics_topic ON repo_topics (topic);
+
+-- One row per repository per UTC day; runs only ever add days, a same-day rerun refreshes its row
+CREATE TABLE IF NOT EXISTS star_snapshots (
+    full_name TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    stars INTEGER NOT NULL,
+    PRIMARY KEY (full_name, day)
+) WITHOUT ROWID;
+
+-- Enrichment fetched per repository; pushed_at is what they were fetched for, NULL when incomplete
+CREATE TABLE IF NOT EXISTS repo_details (
+    full_name TEXT PRIMARY KEY,
+    pushed_at TEXT,
+    fetched_at REAL NOT NULL,
+    readme_excerpt TEXT,
+    latest_release TEXT,
+    release_published_at TEXT,
+    contributors INTEGER,
+    last_commit TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ('name', 'full_name', 'html_url', 'description', 'stars', 'language',
+           'last_updated', 'topics', 'license_name', 'is_fork', 'size_kb')
+
+# Columns added after the first release, created on open in older databases
+MIGRATED_COLUMNS = (('last_seen', 'REAL'), ('legacy', 'INTEGER NOT NULL DEFAULT 0'))
+
+DETAIL_COLUMNS = ('readme_excerpt', 'latest_release', 'release_published_at', 'contributors', 'last_commit')
+
+INSERT_SQL = f"""
+INSERT INTO repos ({', '.join(COLUMNS)}, first_seen, changed_at)
+VALUES ({', '.join(f':{column}' for column in COLUMNS)}, :now, :now)
+"""
+
+# Only touch a stored row when one of its tracked fields actually changed
+UPSERT_SQL = INSERT_SQL + f"""
+ON CONFLICT (full_name) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in COLUMNS if column != 'full_name')},
+    changed_at = excluded.changed_at
+WHERE {' OR '.join(f'{column} IS NOT excluded.{column}' for column in COLUMNS if column != 'full_name')}
+"""
+
+
+DETAILS_SQL = f"""
+INSERT OR REPLACE INTO repo_details (full_name, pushed_at, fetched_at, {', '.join(DETAIL_COLUMNS)})
+VALUES (:full_name, :pushed_at, :fetched_at, {', '.join(f':{column}' for column in DETAIL_COLUMNS)})
+"""
+
+SNAPSHOT_SQL = """
+INSERT INTO star_snapshots (full_name, day, stars) VALUES (?, ?, ?)
+ON CONFLICT (full_name, day) DO UPDATE SET stars = excluded.stars
+"""
+
+# Latest snapshot against the oldest one inside the window; both are primary-key seeks
+VELOCITY_SQL = """
+SELECT latest.day, latest.stars, base.day, base.stars
+FROM star_snapshots AS latest, star_snapshots AS base
+WHERE latest.full_name = :name
+  AND latest.day = (SELECT MAX(day) FROM star_snapshots WHERE full_name = :name)
+  AND base.full_name = :name
+  AND base.day = (SELECT MIN(day) FROM star_snapshots WHERE full_name = :name AND day >= latest.day - :window)
+"""
+
+
+def utc_day(timestamp: Optional[float] = None) -> int:
+    """Days since the Unix epoch, the snapshot log's time unit"""
+    return int((time.time() if timestamp is None else timestamp) // 86400)
+
+
+class RepoStore:
+    """SQLite store of repository records keyed on full_name"""
+
+    def __init__(self, path: str = 'repositories.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        existing = {row['name'] for row in self.conn.execute('PRAGMA table_info(repos)')}
+        missing = [(column, definition) for column, definition in MIGRATED_COLUMNS if column not in existing]
+        if not missing:
+            return
+        with self.conn:
+            for column, definition in missing:
+                self.conn.execute(f'ALTER TABLE repos ADD COLUMN {column} {definition}')
+            # Rows from before the legacy flag existed: let the site seed the legacy file again to mark its rows
+            self.conn.execute("DELETE FROM meta WHERE key = 'seeded_from'")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _row_values(record: Dict, now: float) -> Dict:
+        values = {column: record.get(column) for column in COLUMNS}
+        values['topics'] = json.dumps(list(record.get('topics') or []))
+        values['stars'] = int(values['stars'] or 0)
+        values['size_kb'] = int(values['size_kb'] or 0)
+        values['is_fork'] = int(bool(values['is_fork']))
+        values['now'] = now
+        return values
+
+    def upsert(self, records: Iterable[Dict], only_missing: bool = False) -> int:
+        """Insert or update records, returning how many rows changed"""
+        now = time.time()
+        sql = INSERT_SQL.replace('INSERT', 'INSERT OR IGNORE', 1) if only_missing else UPSERT_SQL
+        changed = 0
+        with self.conn:
+            for record in records:
+                cursor = self.conn.execute(sql, self._row_values(record, now))
+                if cursor.rowcount > 0:
+                    changed += 1
+                    self.conn.execute('DELETE FROM repo_topics WHERE full_name = ?', (record['full_name'],))
+                    self.conn.executemany(
+                        'INSERT OR IGNORE INTO repo_topics (full_name, topic) VALUES (?, ?)',
+                        [(record['full_name'], topic) for topic in record.get('topics') or []]
+                    )
+        return changed
+
+    def mark_seen(self, names: Iterable[str], seen_at: Optional[float] = None) -> float:
+        """Record that the curator published these repositories, returning the timestamp used"""
+        seen_at = time.time() if seen_at is None else seen_at
+        with self.conn:
+            self.conn.executemany('UPDATE repos SET last_seen = ? WHERE full_name = ?',
+                                  ((seen_at, name) for name in names))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('published_at', ?)", (repr(seen_at),))
+        return seen_at
+
+    def mark_legacy(self, names: Iterable[str]) -> int:
+        """Flag repositories from the legacy list, which stay listed whether or not the curator finds them"""
+        with self.conn:
+            cursor = self.conn.executemany('UPDATE repos SET legacy = 1 WHERE full_name = ?', ((name,) for name in names))
+        return cursor.rowcount
+
+    def published_at(self) -> Optional[float]:
+        value = self.get_meta('published_at')
+        return float(value) if value else None
+
+    def iter_repos(self, language: Optional[str] = None, topic: Optional[str] = None,
+                   min_stars: int = 0, limit: Optional[int] = None, seen_since: Optional[float] = None) -> Iterator[Dict]:
+        """Yield records ordered by stars, with any enrichment details, optionally filtered through the indexes
+
+        With seen_since, only legacy repositories and those published at or after it are yielded.
+        """
+        sql = f"SELECT repos.*, {', '.join(f'repo_details.{column}' for column in DETAIL_COLUMNS)} FROM repos"
+        sql += ' LEFT JOIN repo_details USING (full_name)'
+        clauses, params = ['stars >= ?'], [min_stars]
+        if topic:
+            sql += ' JOIN repo_topics USING (full_name)'
+            clauses.append('topic = ?')
+            params.append(topic)
+        if language:
+            clauses.append('language = ?')
+            params.append(language)
+        if seen_since is not None:
+            clauses.append('(legacy = 1 OR last_seen >= ?)')
+            params.append(seen_since)
+        sql += f" WHERE {' AND '.join(clauses)} ORDER BY stars DESC, full_name"
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        for row in self.conn.execute(sql, params):
+            record = {column: row[column] for column in COLUMNS + DETAIL_COLUMNS}
+            record['topics'] = json.loads(row['topics'])
+            record['is_fork'] = bool(row['is_fork'])
+            yield record
+
+    def details(self, names: Iterable[str]) -> Dict[str, Dict]:
+        """Stored enrichment details for the given repositories, keyed by full_name"""
+        found = {}
+        for name in names:
+            row = self.conn.execute('SELECT * FROM repo_details WHERE full_name = ?', (name,)).fetchone()
+            if row is not None:
+                found[name] = dict(row)
+        return found
+
+    def upsert_details(self, records: Iterable[Dict]) -> int:
+        """Replace the enrichment details of each record's repository"""
+        with self.conn:
+            cursor = self.conn.executemany(DETAILS_SQL, records)
+        return cursor.rowcount
+
+    def record_snapshots(self, records: Iterable[Tuple[str, int]], day: Optional[int] = None) -> int:
+        """Append today's (full_name, stars) pairs to the snapshot log"""
+        day = utc_day() if day is None else day
+        with self.conn:
+            cursor = self.conn.executemany(SNAPSHOT_SQL, ((name, day, int(stars or 0)) for name, stars in records))
+        return cursor.rowcount
+
+    def star_velocity(self, window_days: int = 30, names: Optional[List[str]] = None) -> Dict[str, float]:
+        """Stars gained per day over the last window_days of snapshots, per repository
+
+        Repositories with a single snapshot have no measurable growth yet and are
+        reported as 0.0. Without names, every repository in the repos table is used.
+        """
+        if names is None:
+            names = [row[0] for row in self.conn.execute('SELECT full_name FROM repos')]
+        velocities = {}
+        for name in names:
+            row = self.conn.execute(VELOCITY_SQL, {'name': name, 'window': window_days}).fetchone()
+            if row is None:
+                continue
+            latest_day, latest_stars, base_day, base_stars = row
+            velocities[name] = (latest_stars - base_stars) / (latest_day - base_day) if latest_day > base_day else 0.0
+        return velocities
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM repos').fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
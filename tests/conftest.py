@@ -0,0 +1,42 @@
+"""Shared pytest setup: the curator's modules live at the repository root."""
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+QUERIES = ['ai security', 'mcp', 'llm agents']
+
+
+def make_config(**overrides):
+    """A curator config accepting the synthetic API's repositories"""
+    config = {
+        'search_queries': list(QUERIES),
+        'filters': {'min_stars': 5, 'min_size': 0, 'languages': [], 'exclude_keywords': []},
+        'max_repos_per_query': 150,
+        'enable_caching': False,
+        'advanced_options': {'max_workers': 2, 'min_last_update_days': 3650, 'max_retries': 0},
+    }
+    advanced = overrides.pop('advanced_options', {})
+    config.update(overrides)
+    config['advanced_options'].update(advanced)
+    return config
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory with a token set; returns a function writing config.json"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+
+    def write_config(**overrides):
+        config = make_config(**overrides)
+        with open('config.json', 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        return config
+
+    return write_config
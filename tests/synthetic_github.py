@@ -0,0 +1,116 @@
+"""A deterministic stand-in for GitHub's search APIs, for tests and the e2e benchmark."""
+import base64
+import hashlib
+import json
+import random
+import re
+
+from http_replay import RecordedResponse
+
+LANGUAGES = ['Python', 'JavaScript', 'Go', 'Rust', 'C++', 'Java']
+TOPICS = ['ai', 'llm', 'osint', 'security', 'cybersecurity', 'mcp', 'agents',
+          'pentesting', 'threat-intelligence', 'reconnaissance', 'machine-learning']
+
+
+class SyntheticGitHub:
+    """Deterministic stand-in for the REST and GraphQL search APIs, used to record e2e fixtures
+
+    Both APIs serve the same results for a query, so the two search backends
+    can be compared item for item. The enrichment endpoints answer too, and
+    every REST response carries an ETag that If-None-Match turns into a 304.
+    """
+
+    def __init__(self, results_per_query=240, seed=42, core_remaining=5000):
+        self.headers = {}
+        self.results_per_query = results_per_query
+        self.seed = seed
+        self.core_remaining = core_remaining
+        # full_name -> pushed_at, to simulate a push to some repositories
+        self.pushed_at = {}
+        # (path below the API root, status) of every REST request
+        self.requests = []
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def _item(self, rng, index):
+        name = f"repo-{index}"
+        return {
+            'name': name, 'full_name': f"owner{index % 97}/{name}",
+            'html_url': f"https://github.com/owner{index % 97}/{name}",
+            'description': ' '.join(rng.choice(TOPICS) for _ in range(rng.randint(4, 12))),
+            'stargazers_count': max(5, 20000 - index * 7), 'language': rng.choice(LANGUAGES),
+            'updated_at': '2026-10-01T00:00:00Z',
+            'pushed_at': self.pushed_at.get(f"owner{index % 97}/{name}", '2026-09-30T00:00:00Z'),
+            'topics': sorted(rng.sample(TOPICS, rng.randint(0, 5))),
+            'license': {'name': 'MIT License'} if index % 3 else None, 'fork': False, 'size': 1000 + index,
+        }
+
+    def _search(self, query, page, per_page):
+        # Overlapping queries share part of their result sets, like real searches do
+        offset = sum(map(ord, query)) % 150
+        start = (page - 1) * per_page
+        end = min(self.results_per_query, start + per_page)
+        return [self._item(random.Random(f"{self.seed}-{offset + i}"), offset + i) for i in range(start, end)]
+
+    @staticmethod
+    def _node(item):
+        return {
+            'name': item['name'], 'nameWithOwner': item['full_name'], 'url': item['html_url'],
+            'description': item['description'], 'stargazerCount': item['stargazers_count'],
+            'primaryLanguage': {'name': item['language']} if item['language'] else None,
+            'updatedAt': item['updated_at'], 'pushedAt': item['pushed_at'],
+            # GraphQL does not sort topics; the curator does
+            'repositoryTopics': {'nodes': [{'topic': {'name': topic}} for topic in reversed(item['topics'])]},
+            'licenseInfo': item['license'], 'isFork': item['fork'], 'diskUsage': item['size'],
+        }
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        path = url.split('://', 1)[-1].partition('/')[2]
+        if path == 'user':
+            return RecordedResponse(200, {}, json.dumps({'login': 'benchmark'}))
+        if path == 'rate_limit':
+            return RecordedResponse(200, {}, json.dumps({'resources': {'core': {'remaining': self.core_remaining}}}))
+        if path.startswith('repos/'):
+            payload = self._details(*path.split('/')[1:4])
+        else:
+            items = self._search(params['q'], int(params['page']), int(params['per_page']))
+            payload = {'total_count': self.results_per_query, 'incomplete_results': False, 'items': items}
+        body = json.dumps(payload)
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        status = 404 if payload is None else 304 if (headers or {}).get('If-None-Match') == etag else 200
+        self.requests.append((path, status))
+        return RecordedResponse(status, {'ETag': etag, 'Content-Type': 'application/json'}, body if status == 200 else '')
+
+    def _details(self, owner, name, endpoint):
+        """Enrichment payloads; every third repository has no release"""
+        index = int(name.rsplit('-', 1)[1])
+        if endpoint == 'readme':
+            readme = f"# {owner}/{name}\n\nA synthetic repository used to test the curator's enrichment.\n"
+            return {'encoding': 'base64', 'content': base64.b64encode(readme.encode()).decode()}
+        if endpoint == 'releases':
+            return {'tag_name': f"v1.{index}", 'published_at': '2026-09-01T00:00:00Z'} if index % 3 else None
+        if endpoint == 'contributors':
+            return [{'login': f"user{i}"} for i in range(1 + index % 5)]
+        return [{'commit': {'committer': {'date': '2026-09-30T00:00:00Z'}}}]
+
+    def post(self, url, json=None, timeout=None):
+        return self._graphql(json)
+
+    def _graphql(self, request):
+        """Answer the curator's aliased GraphQL search, one page per alias"""
+        per_page = int(re.search(r'first: (\d+)', request['query']).group(1))
+        variables = request['variables']
+        data = {}
+        for name, search in variables.items():
+            if not name.startswith('q_'):
+                continue
+            alias = name[2:]
+            page = int(variables[f"after_{alias}"] or 0) + 1
+            items = self._search(search.replace(' sort:stars-desc', ''), page, per_page)
+            data[alias] = {
+                'repositoryCount': self.results_per_query,
+                'pageInfo': {'hasNextPage': page * per_page < self.results_per_query, 'endCursor': str(page)},
+                'nodes': [self._node(item) for item in items],
+            }
+        return RecordedResponse(200, {'Content-Type': 'application/json'}, json.dumps({'data': data}))
@@ -0,0 +1,20 @@
+"""Streaming analytics must match sorting the whole collection."""
+import math
+import random
+
+from curator_v7 import RepoAnalytics, RepoInfo
+
+
+def test_star_percentiles_match_nearest_rank():
+    rng = random.Random(7)
+    for size in (1, 2, 3, 10, 99, 100, 101, 1000):
+        stars = [rng.choice([5, 10, 10, 50]) if size % 2 else rng.randint(0, 100000) for _ in range(size)]
+        analytics = RepoAnalytics()
+        for i, count in enumerate(stars):
+            analytics.add(RepoInfo(f"r{i}", f"o/r{i}", f"https://github.com/o/r{i}", None, count, 'Python',
+                                   '2026-10-01', [], None))
+        ranked = sorted(stars)
+        assert analytics.result()['star_percentiles'] == {
+            p: ranked[max(0, math.ceil(p / 100 * size) - 1)] for p in RepoAnalytics.PERCENTILES
+        }
+        assert len(analytics.star_counts) == len(set(stars))
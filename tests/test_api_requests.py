@@ -0,0 +1,135 @@
+"""Retries, rate-limit pauses and the circuit breaker around every API request."""
+import threading
+
+import pytest
+
+import curator_v7
+from curator_v7 import CircuitBreaker, GitHubCurator
+from http_replay import RecordedResponse
+
+URL = 'https://api.github.com/search/repositories'
+
+
+class ScriptedSession:
+    """Answers each request with the next scripted (status, headers, body)"""
+
+    def __init__(self, *responses):
+        self.headers = {}
+        self.responses = list(responses)
+        self.requests = 0
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests += 1
+        status, headers, body = self.responses.pop(0)
+        return RecordedResponse(status, headers, body)
+
+
+OK = (200, {}, '{"items": []}')
+
+
+@pytest.fixture
+def curator(workdir, monkeypatch):
+    """A curator over a scripted session that records its backoff sleeps and rate-limit pauses"""
+    def build(*responses, **advanced):
+        workdir(advanced_options=dict({'max_retries': 3, 'retry_backoff_seconds': 1.0}, **advanced))
+        curator = GitHubCurator(session=ScriptedSession(*responses))
+        curator.start_cycle()
+        curator.sleeps, curator.pauses = [], []
+        monkeypatch.setattr(curator, '_sleep', curator.sleeps.append)
+        monkeypatch.setattr(curator.rate_limiter, 'pause_until', curator.pauses.append)
+        return curator
+
+    # Backoff without jitter, so the delays are exact
+    monkeypatch.setattr(curator_v7.random, 'uniform', lambda low, high: high)
+    return build
+
+
+def test_retries_server_errors_with_exponential_backoff(curator):
+    curator = curator((502, {}, 'Bad Gateway'), (503, {}, 'Unavailable'), OK)
+    assert curator._make_api_request(URL) == {'items': []}
+    assert curator.sleeps == [1.0, 2.0]
+    assert curator.metrics.counters['retries'] == 2
+
+
+def test_gives_up_after_max_retries(curator):
+    curator = curator(*[(500, {}, 'Server Error')] * 3, max_retries=2)
+    assert curator._make_api_request(URL) is None
+    assert curator._session.requests == 3
+    assert curator.sleeps == [1.0, 2.0]
+    assert curator.metrics.counters['requests_failed'] == 1
+
+
+def test_secondary_rate_limit_pauses_every_worker(curator, monkeypatch):
+    monkeypatch.setattr(curator_v7.time, 'time', lambda: 1000.0)
+    curator = curator((403, {}, '{"message": "You have exceeded a secondary rate limit"}'),
+                      (429, {'Retry-After': '5'}, ''), OK)
+    assert curator._make_api_request(URL) == {'items': []}
+    # No header: at least a minute; Retry-After: exactly that long. The wait happens in acquire(), not a sleep
+    assert curator.pauses == [1060.0, 1005.0]
+    assert curator.sleeps == [0.0, 0.0]
+    assert curator.metrics.counters['rate_limited'] == 2
+    # Rate limiting is not a failure of the API
+    assert curator.circuit_breaker.failures == 0
+
+
+def test_breaker_trips_and_fails_fast(curator):
+    curator = curator(*[(500, {}, 'Server Error')] * 2, max_retries=0, circuit_breaker_threshold=2)
+    assert curator._make_api_request(URL) is None
+    assert curator._make_api_request(URL) is None
+    assert curator.circuit_breaker.trips == 1
+
+    assert curator._make_api_request(URL) is None
+    assert curator._session.requests == 2
+    assert curator.metrics.counters['circuit_open_rejections'] == 1
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    breaker.record_failure()
+    assert breaker.trips == 1
+
+    barrier = threading.Barrier(8)
+    allowed = []
+
+    def worker():
+        barrier.wait()
+        allowed.append(breaker.allow())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(allowed) == [False] * 7 + [True]
+
+
+def test_probe_outcome_closes_or_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    breaker.record_failure()
+
+    # A failed probe reopens it for another cooldown
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.opened_at is not None and breaker.trips == 2
+
+    # A probe without a verdict (rate limited) frees the slot for the next caller
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.end_probe()
+    assert breaker.allow()
+
+    # A successful probe closes it for everyone
+    breaker.record_success()
+    assert breaker.opened_at is None
+    assert breaker.allow() and breaker.allow()
+
+
+def test_token_is_accepted_only_by_a_served_request(curator):
+    curator = curator((503, {}, 'Unavailable'), (403, {}, '{"message": "Resource not accessible"}'), OK)
+    assert curator._make_api_request(URL) is None
+    assert not curator.token_validated
+    assert curator._make_api_request(URL) == {'items': []}
+    assert curator.token_validated
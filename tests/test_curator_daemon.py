@@ -0,0 +1,41 @@
+"""The daemon keeps running through ordinary errors and builds the website from its own config."""
+import json
+import os
+
+import pytest
+
+from conftest import make_config
+from curator_daemon import CuratorDaemon
+from curator_v7 import GitHubCurator, TokenRejectedError
+from synthetic_github import SyntheticGitHub
+
+
+def test_only_a_rejected_token_stops_the_daemon(workdir, monkeypatch):
+    workdir()
+    daemon = CuratorDaemon(GitHubCurator(session=SyntheticGitHub()), {'port': 0, 'tick_seconds': 0})
+    errors = [ValueError("invalid literal for int() with base 10: 'soon'"), ValueError("Expecting value"),
+              TokenRejectedError("Invalid GitHub token. Please check your token and permissions.")]
+    ticks = []
+
+    def tick():
+        ticks.append(errors[len(ticks)])
+        raise ticks[-1]
+
+    monkeypatch.setattr(daemon, 'tick', tick)
+    with pytest.raises(TokenRejectedError):
+        daemon.serve_forever()
+    assert ticks == errors
+
+
+def test_regenerates_the_website_from_its_config_path(workdir):
+    config = make_config(store_path='other.db', advanced_options={'metrics_file': 'other_metrics.jsonl'})
+    with open('other.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    daemon = CuratorDaemon(GitHubCurator('other.json', session=SyntheticGitHub()), {'regenerate_website': True})
+
+    assert daemon.tick()
+    with open(os.path.join('docs', 'repos.json'), encoding='utf-8') as f:
+        assert json.load(f)['total'] == daemon.curator.metrics.gauges['unique_repos']
+    with open('other_metrics.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['name'] for line in f] == ['website', 'curator']
+    assert not os.path.exists('run_metrics.jsonl')
@@ -0,0 +1,116 @@
+"""Replay recorded search fixtures through run() and generate_website() and check what they write."""
+import json
+import os
+
+import pytest
+
+from curator_v7 import GitHubCurator, RepoInfo
+from generate_website import generate_website
+from http_replay import RecordingSession
+from repo_store import RepoStore
+from synthetic_github import SyntheticGitHub
+
+REPLAY = {'http_mode': 'replay', 'fixtures_dir': 'fixtures'}
+
+
+@pytest.fixture
+def recorded(workdir):
+    """Record one run against the synthetic API, then clear everything but the fixtures"""
+    workdir(enable_caching=True, cache_duration_hours=0)
+    GitHubCurator(session=RecordingSession('fixtures', SyntheticGitHub())).run()
+    for path in ('cache.json', 'http_cache.json.gz', 'repositories.db', 'README.md', 'run_metrics.jsonl'):
+        os.remove(path)
+
+    # What the run must produce: every query's first 150 results, deduplicated, best-starred first
+    api = SyntheticGitHub()
+    curator = GitHubCurator(session=api)
+    expected = {}
+    for query in curator.config['search_queries']:
+        search = curator._build_search_query(query)
+        items = api._search(search, 1, 100) + api._search(search, 2, 100)
+        for item in items[:150]:
+            expected.setdefault(item['html_url'], RepoInfo.from_github_api(item))
+    return workdir, sorted(expected.values(), key=lambda repo: -repo.stars)
+
+
+def _run(workdir, advanced_options=None, **overrides):
+    workdir(advanced_options=dict(REPLAY, **(advanced_options or {})), enable_caching=True, **overrides)
+    curator = GitHubCurator()
+    curator.run()
+    with open('README.md', encoding='utf-8') as f:
+        # Everything but the "Last updated" timestamp line
+        return curator, ''.join(line for line in f if not line.startswith('*Last updated'))
+
+
+def test_run_from_fixtures(recorded):
+    workdir, expected = recorded
+    curator, readme = _run(workdir, cache_duration_hours=0)
+
+    assert curator._session.missing == 0
+    assert curator.metrics.gauges['unique_repos'] == len(expected)
+    assert f"[{expected[0].name}]({expected[0].html_url})" in readme
+
+    with open('cache.json', encoding='utf-8') as f:
+        cache = json.load(f)
+    assert len(cache['rows']) == len(expected)
+    assert len(cache['queries']) == 3
+
+    with RepoStore('repositories.db') as store:
+        stored = list(store.iter_repos(seen_since=store.published_at()))
+    assert [record['full_name'] for record in stored] == [repo.full_name for repo in expected]
+
+
+def test_revalidation_and_cached_runs_match(recorded):
+    workdir, _ = recorded
+    _, first = _run(workdir, cache_duration_hours=0)
+
+    # Stale cache: every page is revalidated with its ETag and answered 304
+    curator, revalidated = _run(workdir, cache_duration_hours=0)
+    assert curator.metrics.counters['responses_304'] == curator.metrics.counters['requests'] > 0
+    assert revalidated == first
+
+    # Fresh cache: no requests at all
+    curator, cached = _run(workdir, cache_duration_hours=24)
+    assert curator.metrics.counters['requests'] == 0
+    assert cached == first
+
+
+def test_website_lists_the_published_repositories(recorded):
+    workdir, expected = recorded
+    _run(workdir, cache_duration_hours=0)
+    generate_website()
+
+    with open(os.path.join('docs', 'repos.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['total'] == len(expected)
+    with open(os.path.join('docs', 'index.html'), encoding='utf-8') as f:
+        assert expected[0].html_url in f.read()
+
+
+def test_website_reads_the_configured_store(recorded, capsys):
+    workdir, expected = recorded
+    _run(workdir, cache_duration_hours=0, store_path='custom.db')
+    generate_website()
+    assert f"Used {len(expected)} repositories from custom.db" in capsys.readouterr().out
+
+    # With the store disabled, a leftover database is ignored in favour of cache.json
+    with RepoStore('repositories.db') as store:
+        store.upsert([{'name': 'stale', 'full_name': 'o/stale', 'html_url': 'https://github.com/o/stale', 'stars': 1}])
+        store.mark_seen(['o/stale'])
+    workdir(advanced_options=REPLAY, store_path='')
+    generate_website()
+    with open(os.path.join('docs', 'repos.json'), encoding='utf-8') as f:
+        assert json.load(f)['total'] == len(expected)
+    assert 'merged repositories' in capsys.readouterr().out
+
+
+def test_website_metrics_follow_metrics_file(recorded):
+    workdir, _ = recorded
+    _run(workdir, cache_duration_hours=0, advanced_options={'metrics_file': 'custom_metrics.jsonl'})
+    generate_website()
+    with open('custom_metrics.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['name'] for line in f] == ['curator', 'website']
+
+    workdir(advanced_options=dict(REPLAY, metrics_file=''))
+    generate_website()
+    assert not os.path.exists('run_metrics.jsonl')
@@ -0,0 +1,63 @@
+"""Enrichment: the request budget, re-fetching only pushed repositories and ETag reuse across runs."""
+import gzip
+import json
+
+from curator_v7 import GitHubCurator
+from repo_store import RepoStore
+from synthetic_github import SyntheticGitHub
+
+
+def _enrichment_requests(api):
+    return [status for path, status in api.requests if path.startswith('repos/')]
+
+
+def _run(workdir, api, **enrichment):
+    workdir(enable_caching=True, cache_duration_hours=0, max_repos_per_query=5,
+            advanced_options={'enrichment': dict({'enabled': True, 'max_workers': 2}, **enrichment)})
+    api.requests.clear()
+    curator = GitHubCurator(session=api)
+    curator.run()
+    return curator
+
+
+def test_request_budget_defers_the_rest(workdir):
+    api = SyntheticGitHub(core_remaining=520)
+    curator = _run(workdir, api, max_requests=40, reserve_requests=500)
+    unique = curator.metrics.gauges['unique_repos']
+
+    # 520 left above a 500 reserve pays for five repositories' four requests each
+    assert len(_enrichment_requests(api)) == 20
+    assert curator.metrics.counters['enriched'] == 5
+    assert curator.metrics.counters['enrichment_deferred'] == unique - 5
+
+    api.core_remaining = 5000
+    curator = _run(workdir, api, max_requests=40, reserve_requests=500)
+    assert curator.metrics.counters['enriched'] == min(10, unique - 5)
+
+
+def test_refetches_only_pushed_repositories_and_revalidates(workdir):
+    api = SyntheticGitHub()
+    curator = _run(workdir, api)
+    unique = curator.metrics.gauges['unique_repos']
+    assert len(_enrichment_requests(api)) == 4 * unique
+    # Every 200 is kept for revalidation; the 404s of repositories without a release are not
+    with gzip.open('http_cache.json.gz', 'rt', encoding='utf-8') as f:
+        cached = [key for key in json.load(f) if '/repos/' in key]
+    assert len(cached) == 4 * unique - curator.metrics.counters['responses_4xx']
+
+    # Nobody pushed: stored details are reused without a request
+    _run(workdir, api)
+    assert _enrichment_requests(api) == []
+
+    # One push: only that repository is fetched again, and its unchanged responses come back 304
+    with RepoStore('repositories.db') as store:
+        pushed = next(record['full_name'] for record in store.iter_repos()
+                      if int(record['full_name'].rsplit('-', 1)[1]) % 3)
+    api.pushed_at[pushed] = '2026-10-10T00:00:00Z'
+    curator = _run(workdir, api)
+    assert {path for path, _ in api.requests if path.startswith('repos/')} == {
+        f"repos/{pushed}/{endpoint}" for endpoint in ('readme', 'releases/latest', 'contributors', 'commits')}
+    assert _enrichment_requests(api) == [304] * 4
+    assert curator.metrics.counters['enriched'] == 1
+    with RepoStore('repositories.db') as store:
+        assert store.details([pushed])[pushed]['pushed_at'] == '2026-10-10T00:00:00Z'
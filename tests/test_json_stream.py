@@ -0,0 +1,75 @@
+"""JSONStreamReader must decode the same values whatever the chunk size."""
+import io
+import json
+import random
+
+import pytest
+
+from json_stream import JSONStreamReader, iter_records
+
+
+def _read(text, chunk_size):
+    """Decode a top-level array or object the way load_cache and iter_records walk it"""
+    reader = JSONStreamReader(io.StringIO(text), chunk_size)
+    if reader.peek_type() == 'array':
+        return list(reader.iter_array())
+    result = {}
+    for key in reader.iter_object_keys():
+        result[key] = list(reader.iter_array()) if reader.peek_type() == 'array' else reader.decode_value()
+    return result
+
+
+def _random_value(rng, depth=0):
+    choice = rng.random()
+    if choice < 0.3:
+        return rng.choice([1760000000.25, 1e-7, -12, 0, 3.5e10, -0.5, 12345678901234])
+    if choice < 0.4:
+        return rng.choice([True, False, None, 's"x', 'é', ''])
+    if depth < 2 and choice < 0.7:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    if depth < 2:
+        return {f"k{i}": _random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+    return rng.randrange(-99999, 99999) / 7
+
+
+@pytest.mark.parametrize('number', ['1760000000.25', '1e-7', '-12.5E+3', '12345678901234'])
+def test_number_cut_at_every_offset(number):
+    text = '{"timestamp": %s, "rows": [%s, 1]}' % (number, number)
+    expected = json.loads(text)
+    for chunk_size in range(1, len(text) + 1):
+        assert _read(text, chunk_size) == expected, chunk_size
+
+
+def test_number_cut_at_default_chunk_boundary():
+    # The header number straddles the 64 KiB boundary right after its decimal point
+    prefix = '{"pad": "%s", "timestamp": 1760000000.'
+    padding = 'x' * ((1 << 16) - len(prefix % ''))
+    text = (prefix % padding) + '25, "rows": []}'
+    assert _read(text, 1 << 16) == json.loads(text)
+
+
+def test_random_documents_match_json_loads():
+    rng = random.Random(0)
+    for _ in range(200):
+        if rng.random() < 0.5:
+            value = {'timestamp': _random_value(rng), 'rows': [_random_value(rng) for _ in range(5)]}
+        else:
+            value = [_random_value(rng) for _ in range(6)]
+        text = json.dumps(value)
+        for chunk_size in (1, 2, 3, 5, 7, 11, 16):
+            assert _read(text, chunk_size) == value
+
+
+def test_malformed_array_is_rejected():
+    with pytest.raises(ValueError):
+        list(JSONStreamReader(io.StringIO('[1, 2 3]'), 2).iter_array())
+
+
+def test_iter_records_formats(tmp_path):
+    records = [{'name': 'a', 'stars': 1.5}, {'name': 'b', 'stars': 2}]
+    (tmp_path / 'repos.json').write_text(json.dumps(records))
+    (tmp_path / 'keyed.json').write_text(json.dumps({'generated': 1.0, 'repositories': records, 'after': [3]}))
+    (tmp_path / 'repos.jsonl').write_text('\n'.join(json.dumps(record) for record in records) + '\n\n')
+    assert list(iter_records(str(tmp_path / 'repos.json'))) == records
+    assert list(iter_records(str(tmp_path / 'keyed.json'), 'repositories')) == records
+    assert list(iter_records(str(tmp_path / 'repos.jsonl'))) == records
@@ -0,0 +1,104 @@
+"""Search planning: which queries are merged or split, and how merged results are attributed."""
+from datetime import date
+
+from curator_v7 import GitHubCurator, RepoInfo
+from query_planner import PlannedSearch, attribute, is_saturated, plan_searches
+
+SETTINGS = {'enabled': True, 'merge_max_results': 100, 'min_overlap': 0.2, 'max_merge': 3}
+
+
+def _stats(total, repos=(), **extra):
+    return dict({'total_count': total, 'stop_reason': 'exhausted', 'repos': list(repos)}, **extra)
+
+
+def _repo(name, description='', topics=(), stars=10):
+    return RepoInfo(name, f"o/{name}", f"https://github.com/o/{name}", description, stars, 'Python',
+                    '2026-10-01', list(topics), None)
+
+
+def test_merges_overlapping_single_keywords_in_configured_order():
+    queries = ['mcp', 'agent prompt', 'jailbreak', 'stars:>5 llm']
+    stats = {query: _stats(30, ['shared', query]) for query in queries}
+    assert plan_searches(queries, stats, SETTINGS) == [
+        PlannedSearch('mcp OR jailbreak', ['mcp', 'jailbreak'], 'merged'),
+        PlannedSearch('agent prompt', ['agent prompt']),
+        PlannedSearch('stars:>5 llm', ['stars:>5 llm']),
+    ]
+
+
+def test_does_not_merge_without_overlap_stats_or_room():
+    queries = ['mcp', 'jailbreak', 'osint']
+    disjoint = {'mcp': _stats(30, ['a']), 'jailbreak': _stats(30, ['b'])}
+    assert all(planned.kind == 'single' for planned in plan_searches(queries, disjoint, SETTINGS))
+
+    too_big = {query: _stats(60, ['shared']) for query in queries}
+    assert all(planned.kind == 'single' for planned in plan_searches(queries, too_big, SETTINGS))
+
+    fits_nothing = {query: _stats(10, ['shared']) for query in queries}
+    plan = plan_searches(queries, fits_nothing, SETTINGS, fits=lambda search: ' OR ' not in search)
+    assert all(planned.kind == 'single' for planned in plan)
+
+
+def test_respects_max_merge():
+    queries = ['a1', 'b2', 'c3', 'd4']
+    stats = {query: _stats(10, ['shared']) for query in queries}
+    plan = plan_searches(queries, stats, dict(SETTINGS, max_merge=2))
+    assert [planned.members for planned in plan] == [['a1', 'b2'], ['c3', 'd4']]
+
+
+def test_splits_saturated_query_by_stars():
+    stats = {'llm': _stats(5000, stop_reason='max_pages', lowest_stars=800, window_results=120)}
+    plan = plan_searches(['llm'], stats, SETTINGS, min_stars=5, max_repos=200)
+    assert plan == [PlannedSearch('llm stars:>800', ['llm'], 'split'),
+                    PlannedSearch('llm stars:5..800', ['llm'], 'split')]
+
+
+def test_split_falls_back_to_pushed_ranges():
+    stats = {'llm stars:>5': _stats(5000, stop_reason='max_pages', lowest_stars=800, window_results=0)}
+    plan = plan_searches(['llm stars:>5'], stats, SETTINGS, pushed_after=date(2025, 1, 1))
+    assert [planned.kind for planned in plan] == ['split', 'split']
+    assert plan[0].search.startswith('llm stars:>5 pushed:>=')
+    assert plan[1].search.startswith('llm stars:>5 pushed:2025-01-01..')
+
+
+def test_split_ranges_keep_the_best_starred_results(workdir, monkeypatch):
+    query = 'llm stars:>5'
+    workdir(search_queries=[query], max_repos_per_query=3, advanced_options={'query_planner': {'enabled': True}})
+    curator = GitHubCurator()
+    curator.start_cycle()
+    curator.query_stats = {query: _stats(5000, stop_reason='max_pages', lowest_stars=800, window_results=0)}
+    # The recent pushed range comes first in the plan but holds the fewest stars
+    recent = [_repo('recent-10', stars=10), _repo('recent-9', stars=9)]
+    older = [_repo('older-9000', stars=9000), _repo('older-500', stars=500), _repo('older-20', stars=20)]
+    searches = []
+
+    def fetch(queries, quotas=None, feeds_threshold=None):
+        searches.extend(queries)
+        return [recent, older]
+
+    monkeypatch.setattr(curator, '_fetch_queries', fetch)
+    query_cache = {}
+    effective_queries = curator.effective_queries()
+    curator.refresh_queries(query_cache, [query], effective_queries)
+
+    assert searches[0].startswith(f"{query} pushed:>=")
+    kept = query_cache[effective_queries[query]]['repositories']
+    assert [repo.stars for repo in kept] == [9000, 500, 20]
+
+
+def test_saturation_needs_a_full_window_short_of_the_quota():
+    assert not is_saturated(_stats(900, stop_reason='max_pages'))
+    assert not is_saturated(_stats(5000, stop_reason='exhausted'))
+    assert not is_saturated(_stats(5000, stop_reason='max_pages', window_results=200), max_repos=200)
+    assert is_saturated(_stats(5000, stop_reason='max_pages', window_results=150), max_repos=200)
+    assert is_saturated(_stats(5000, split_pivot=800, window_results=150), max_repos=200)
+    stats = {'llm': _stats(5000, stop_reason='max_pages', lowest_stars=800)}
+    assert plan_searches(['llm'], stats, dict(SETTINGS, split_saturated=False)) == [PlannedSearch('llm', ['llm'])]
+
+
+def test_attribute_by_term_prefix():
+    repos = [_repo('mcp-server', 'Servers for agents'), _repo('jailbreaks', 'Prompt collection'),
+             _repo('both', 'MCP jailbreak tests'), _repo('other', 'Unrelated', ['tools'])]
+    attributed = attribute(repos, ['mcp', 'jailbreak'])
+    assert [repo.name for repo in attributed['mcp']] == ['mcp-server', 'both', 'other']
+    assert [repo.name for repo in attributed['jailbreak']] == ['jailbreaks', 'both']
@@ -0,0 +1,90 @@
+"""RepoFilter must accept exactly what the original per-repository checks accepted."""
+import random
+from datetime import datetime, timedelta
+
+from curator_v7 import RepoFilter, RepoInfo
+
+
+def legacy_include(config, repo):
+    """The checks RepoFilter replaced, as they were written"""
+    filters = config.get('filters', {})
+    advanced = config.get('advanced_options', {})
+    if repo.stars < int(filters.get('min_stars', 0)):
+        return False
+    if repo.size_kb < int(filters.get('min_size', 0)):
+        return False
+    languages = filters.get('languages', [])
+    if languages and repo.language not in languages:
+        return False
+    if not advanced.get('include_forks', False) and repo.is_fork:
+        return False
+    if advanced.get('require_license', False) and not repo.license_name:
+        return False
+    if not repo.last_updated:
+        return False
+    try:
+        updated = datetime.strptime(repo.last_updated, "%Y-%m-%d")
+    except ValueError:
+        return False
+    if (datetime.utcnow() - updated).days > int(advanced.get('min_last_update_days', 365)):
+        return False
+    searchable_text = f"{repo.name} {repo.description or ''}".lower()
+    if any(keyword.lower() in searchable_text for keyword in filters.get('exclude_keywords', [])):
+        return False
+    if any(name in repo.name.lower() for name in ['awesome', 'list', 'collection', 'resources']):
+        return repo.stars > 1000
+    if not repo.description or len(repo.description) < 20:
+        return repo.stars > 100
+    return True
+
+
+def _random_repo(rng):
+    today = datetime.utcnow().date()
+    last_updated = rng.choice([
+        (today - timedelta(days=rng.randint(0, 800))).isoformat(),
+        '', 'not-a-date',
+    ])
+    name = rng.choice(['tool', 'awesome-ai', 'scanner', 'link-list', 'Agent', 'resources-x'])
+    description = rng.choice([None, '', 'short', 'An LLM security scanner for agents', 'Tutorial-Only notes on osint tools'])
+    return RepoInfo(
+        name=name, full_name=f"o/{name}", html_url=f"https://github.com/o/{name}", description=description,
+        stars=rng.choice([0, 5, 50, 101, 999, 1001, 5000]), language=rng.choice(['Python', 'Go', 'Shell', None]),
+        last_updated=last_updated, topics=[], license_name=rng.choice([None, 'MIT']),
+        is_fork=rng.random() < 0.2, size_kb=rng.choice([0, 100, 600, 5000]),
+    )
+
+
+def _random_config(rng):
+    return {
+        'filters': {
+            'min_stars': rng.choice([0, 5, 100]),
+            'min_size': rng.choice([0, 500]),
+            'languages': rng.choice([[], ['Python', 'Go']]),
+            'exclude_keywords': rng.choice([[], ['tutorial-only', 'AWESOME']]),
+        },
+        'advanced_options': {
+            'include_forks': rng.random() < 0.5,
+            'require_license': rng.random() < 0.5,
+            'min_last_update_days': rng.choice([0, 30, 365]),
+        },
+    }
+
+
+def test_matches_original_checks():
+    rng = random.Random(7)
+    for _ in range(200):
+        config = _random_config(rng)
+        repo_filter = RepoFilter(config)
+        for _ in range(50):
+            repo = _random_repo(rng)
+            assert repo_filter(repo) == legacy_include(config, repo), (config, repo)
+
+
+def test_counts_rejections_by_stage():
+    repo_filter = RepoFilter({'filters': {'min_stars': 10}, 'advanced_options': {}})
+    today = datetime.utcnow().date().isoformat()
+    repo = RepoInfo('tool', 'o/tool', 'https://github.com/o/tool', 'A long enough description here', 3,
+                    'Python', today, [], None)
+    assert not repo_filter(repo)
+    assert repo_filter.rejections == {'min_stars': 1}
+    assert (repo_filter.checked, repo_filter.accepted) == (1, 0)
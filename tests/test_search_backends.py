@@ -0,0 +1,41 @@
+"""The GraphQL search backend must return exactly what the REST backend does."""
+from curator_v7 import GitHubCurator
+from http_replay import RecordingSession, ReplaySession
+from synthetic_github import SyntheticGitHub
+
+
+def _fetch(session):
+    curator = GitHubCurator(session=session)
+    return curator._fetch_queries(curator.config['search_queries']), curator
+
+
+def test_graphql_matches_rest(workdir):
+    workdir(advanced_options={'search_backend': 'rest'})
+    rest, _ = _fetch(SyntheticGitHub())
+    workdir(advanced_options={'search_backend': 'graphql'})
+    graphql, curator = _fetch(SyntheticGitHub())
+
+    assert [len(repos) for repos in rest] == [150, 150, 150]
+    assert graphql == rest
+    assert all(progress.stop_reason == 'quota' for progress in curator.query_progress.values())
+
+
+def test_graphql_batches_queries(workdir):
+    workdir(advanced_options={'search_backend': 'graphql', 'graphql_batch_size': 5})
+    session = RecordingSession('fixtures', SyntheticGitHub())
+    _fetch(session)
+    # Two pages for every query, each page of all three queries in one POST
+    assert len(list(session.fixtures_dir.iterdir())) == 2
+
+
+def test_graphql_replays_recorded_fixtures(workdir):
+    workdir(advanced_options={'search_backend': 'rest'})
+    rest, _ = _fetch(SyntheticGitHub())
+
+    workdir(advanced_options={'search_backend': 'graphql'})
+    _fetch(RecordingSession('fixtures', SyntheticGitHub()))
+    replay = ReplaySession('fixtures', rate_limit=5000)
+    replayed, _ = _fetch(replay)
+
+    assert replay.missing == 0
+    assert replayed == rest